@@ -0,0 +1,307 @@
+"""
+superhero.activity_log: one definition for every writer
+
+The table is range-partitioned by created_at (one partition per
+ACTIVITY_LOG_PARTITION_SECONDS, default one hour) with a BRIN index on
+created_at. Retention detaches and drops whole partitions older than
+ACTIVITY_LOG_RETENTION_SECONDS instead of DELETEing rows, so its cost does
+not depend on the row count and leaves nothing behind for VACUUM.
+
+A DEFAULT partition catches rows outside the partitions (maintenance more
+than PREMAKE partitions behind, clock skew), so writes never fail for lack
+of a partition; the next maintenance moves them into the range partition it
+creates for them. PostgreSQL does not allow DETACH ... CONCURRENTLY next to a
+DEFAULT partition, so expired partitions are detached with a plain DETACH.
+All maintenance DDL runs under a short lock_timeout (DDL_LOCK_TIMEOUT): on a
+busy table a step gives up and is retried on the next run instead of
+queueing the writers behind its lock. A partition left "pending" by an
+interrupted concurrent detach of an earlier version is finalized before it
+is dropped, and an expired partition detached by a run whose DROP gave up is
+found by name and dropped by the next one.
+
+Writers call ActivityLogMaintainer.run_if_due() in their loop (it also
+creates the table on first use); advisory locks make concurrent writers
+take turns.
+"""
+import io
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+import psycopg2.errors
+from psycopg2.extras import execute_values
+
+SCHEMA = "superhero"
+TABLE = "activity_log"
+PARTITION_SECONDS = int(os.getenv("ACTIVITY_LOG_PARTITION_SECONDS", "3600"))
+RETENTION_SECONDS = int(os.getenv("ACTIVITY_LOG_RETENTION_SECONDS", "3600"))
+PREMAKE = int(os.getenv("ACTIVITY_LOG_PREMAKE", "3"))
+_LOCK_KEY = 0x5AC71F17  # pg_try_advisory_lock key shared by all writers
+DDL_LOCK_TIMEOUT = os.getenv("ACTIVITY_LOG_DDL_LOCK_TIMEOUT", "1s")
+
+CREATE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SCHEMA}.{TABLE} (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    activity_type VARCHAR(50),
+    hero_id INT,
+    value NUMERIC
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX IF NOT EXISTS ix_{TABLE}_created_at ON {SCHEMA}.{TABLE} USING brin (created_at);
+
+CREATE TABLE IF NOT EXISTS {SCHEMA}.{TABLE}_default PARTITION OF {SCHEMA}.{TABLE} DEFAULT;
+"""
+
+COLUMNS = ("activity_type", "hero_id", "value")
+INSERT_SQL = f"INSERT INTO {SCHEMA}.{TABLE} ({', '.join(COLUMNS)}) VALUES (%s, %s, %s)"
+
+# "FOR VALUES FROM ('2025-01-01 10:00:00+00') TO ('2025-01-01 11:00:00+00')" (rendered with TimeZone=UTC)
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{8}}_\d{{6}})$")
+
+
+def record(cur, activity_type, value, hero_id=None):
+    cur.execute(INSERT_SQL, (activity_type, hero_id, value))
+
+
+# --- BULK WRITES ---
+# Each strategy inserts `rows` ((activity_type, hero_id, value) tuples) with `cur`; the caller commits.
+
+def insert_single(cur, rows):
+    for row in rows:
+        cur.execute(INSERT_SQL, row)
+
+
+def insert_executemany(cur, rows):
+    cur.executemany(INSERT_SQL, rows)
+
+
+def insert_execute_values(cur, rows):
+    execute_values(cur, f"INSERT INTO {SCHEMA}.{TABLE} ({', '.join(COLUMNS)}) VALUES %s", rows, page_size=len(rows))
+
+
+def insert_multirow(cur, rows):
+    """One INSERT ... VALUES (..), (..), ... statement for the whole batch."""
+    placeholders = ", ".join(["(%s, %s, %s)"] * len(rows))
+    cur.execute(f"INSERT INTO {SCHEMA}.{TABLE} ({', '.join(COLUMNS)}) VALUES {placeholders}",
+                [value for row in rows for value in row])
+
+
+def _copy_text(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def insert_copy(cur, rows):
+    data = io.StringIO("".join("\t".join(_copy_text(v) for v in row) + "\n" for row in rows))
+    cur.copy_expert(f"COPY {SCHEMA}.{TABLE} ({', '.join(COLUMNS)}) FROM STDIN", data)
+
+
+WRITE_STRATEGIES = {
+    "single": insert_single,
+    "executemany": insert_executemany,
+    "execute_values": insert_execute_values,
+    "multirow": insert_multirow,
+    "copy": insert_copy,
+}
+
+
+def _relkind(cur, name):
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (f"{SCHEMA}.{name}",))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def ensure_table(conn):
+    """Creates the partitioned table; an older unpartitioned activity_log is renamed to activity_log_legacy."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_KEY,))
+        if _relkind(cur, TABLE) == "r":
+            legacy = f"{TABLE}_legacy"
+            if _relkind(cur, legacy):
+                legacy = f"{TABLE}_legacy_{int(time.time())}"
+            cur.execute(f"ALTER TABLE {SCHEMA}.{TABLE} RENAME TO {legacy}")
+            cur.execute(f"ALTER SEQUENCE IF EXISTS {SCHEMA}.{TABLE}_id_seq RENAME TO {legacy}_id_seq")
+            print(f"Renamed the unpartitioned {SCHEMA}.{TABLE} to {SCHEMA}.{legacy}")
+        cur.execute(CREATE_SQL)
+    conn.commit()
+
+
+def _utc(text):
+    return datetime.strptime(text[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+class ActivityLogMaintainer:
+    """Keeps PREMAKE future partitions ahead of now and drops the expired ones."""
+
+    def __init__(self, partition_seconds=PARTITION_SECONDS, retention_seconds=RETENTION_SECONDS,
+                 premake=PREMAKE, check_seconds=None):
+        self.partition_seconds = partition_seconds
+        self.retention_seconds = retention_seconds
+        self.premake = premake
+        # Well inside one partition, so a missing partition is created before it is needed
+        self.check_seconds = check_seconds or max(1, min(300, partition_seconds // 4))
+        self._next_check = 0.0
+        self._table_ready = False
+
+    def partition_name(self, start):
+        return f"{TABLE}_p{start.strftime('%Y%m%d_%H%M%S')}"
+
+    def partitions(self, cur):
+        """[(name, lower, upper, detach_pending)] of the range partitions, oldest first (DEFAULT excluded)."""
+        cur.execute("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), i.inhdetachpending
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+        """, (f"{SCHEMA}.{TABLE}",))
+        bounds = []
+        for name, expr, pending in cur.fetchall():
+            match = _BOUND.search(expr or "")
+            if match:
+                bounds.append((name, _utc(match.group(1)), _utc(match.group(2)), pending))
+        return sorted(bounds, key=lambda b: b[1])
+
+    def detached(self, cur):
+        """[(name, lower)] of former partitions that were detached but not dropped."""
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind = 'r' AND NOT c.relispartition
+        """, (SCHEMA,))
+        leftovers = []
+        for (name,) in cur.fetchall():
+            match = _PARTITION_NAME.match(name)
+            if match:
+                lower = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").replace(tzinfo=timezone.utc)
+                leftovers.append((name, lower))
+        return leftovers
+
+    def maintain(self, conn, now=None):
+        """Creates the missing partitions, drops the expired ones; returns (created, dropped) names.
+
+        Skipped (returns None) while another writer holds the maintenance lock.
+        Call it outside a transaction: it switches the connection to autocommit.
+        """
+        now = now or time.time()
+        if not self._table_ready:
+            ensure_table(conn)
+            self._table_ready = True
+        autocommit = conn.autocommit
+        conn.autocommit = True  # DETACH ... FINALIZE must not run inside a transaction
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_lock(%s)", (_LOCK_KEY,))
+                if not cur.fetchone()[0]:
+                    return None
+                try:
+                    cur.execute("SET TimeZone = 'UTC'")
+                    cur.execute("SET lock_timeout = %s", (DDL_LOCK_TIMEOUT,))
+                    existing = self.partitions(cur)
+                    created = self._create(cur, existing, now)
+                    dropped = self._drop_expired(cur, existing, now)
+                finally:
+                    cur.execute("RESET TimeZone")
+                    cur.execute("RESET lock_timeout")
+                    cur.execute("SELECT pg_advisory_unlock(%s)", (_LOCK_KEY,))
+        finally:
+            conn.autocommit = autocommit
+        return created, dropped
+
+    def _create(self, cur, existing, now):
+        created = []
+        first = int(now // self.partition_seconds) * self.partition_seconds
+        for k in range(self.premake + 1):
+            lower = datetime.fromtimestamp(first + k * self.partition_seconds, timezone.utc)
+            upper = datetime.fromtimestamp(first + (k + 1) * self.partition_seconds, timezone.utc)
+            if any(lo < upper and lower < hi for _, lo, hi, _ in existing):
+                continue  # covered (also by a partition of an earlier, different interval)
+            name = self.partition_name(lower)
+            try:
+                self._create_partition(cur, name, lower, upper)
+            except psycopg2.errors.LockNotAvailable:
+                continue  # busy: the DEFAULT partition takes the rows until the next maintain()
+            created.append(name)
+        return created
+
+    def _create_partition(self, cur, name, lower, upper):
+        """CREATE ... PARTITION OF; rows of the range already in the DEFAULT partition are moved into it first
+        (a range partition cannot be created while DEFAULT holds rows that belong to it)."""
+        default = f"{SCHEMA}.{TABLE}_default"
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= %s AND created_at < %s)",
+                    (lower, upper))
+        if not cur.fetchone()[0]:
+            cur.execute(f"CREATE TABLE IF NOT EXISTS {SCHEMA}.{name} PARTITION OF {SCHEMA}.{TABLE} "
+                        "FOR VALUES FROM (%s) TO (%s)", (lower, upper))
+            return
+        cur.execute("BEGIN")
+        try:
+            cur.execute(f"CREATE TABLE {SCHEMA}.{name} (LIKE {SCHEMA}.{TABLE} INCLUDING DEFAULTS)")
+            cur.execute(f"""
+                WITH moved AS (DELETE FROM {default} WHERE created_at >= %s AND created_at < %s RETURNING *)
+                INSERT INTO {SCHEMA}.{name} SELECT * FROM moved
+            """, (lower, upper))
+            moved = cur.rowcount
+            cur.execute(f"ALTER TABLE {SCHEMA}.{TABLE} ATTACH PARTITION {SCHEMA}.{name} "
+                        "FOR VALUES FROM (%s) TO (%s)", (lower, upper))
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        print(f"Moved {moved} rows from {default} into the new partition {SCHEMA}.{name}")
+
+    def _drop_expired(self, cur, existing, now):
+        dropped = []
+        cutoff = datetime.fromtimestamp(now - self.retention_seconds, timezone.utc)
+        # Detached by an earlier run whose DROP gave up; partitions() no longer lists them
+        for name, lower in self.detached(cur):
+            if lower < cutoff and self._drop(cur, name):
+                dropped.append(name)
+        for name, _, upper, pending in existing:
+            if not pending and upper > cutoff:
+                continue
+            try:
+                if pending:
+                    # An interrupted DETACH ... CONCURRENTLY: a new one would fail, FINALIZE completes it
+                    cur.execute(f"ALTER TABLE {SCHEMA}.{TABLE} DETACH PARTITION {SCHEMA}.{name} FINALIZE")
+                else:
+                    cur.execute(f"ALTER TABLE {SCHEMA}.{TABLE} DETACH PARTITION {SCHEMA}.{name}")
+            except psycopg2.errors.LockNotAvailable:
+                continue  # busy: retried by the next maintain()
+            if self._drop(cur, name):
+                dropped.append(name)
+        cur.execute(f"DELETE FROM {SCHEMA}.{TABLE}_default WHERE created_at < %s", (cutoff,))
+        return dropped
+
+    @staticmethod
+    def _drop(cur, name):
+        try:
+            cur.execute(f"DROP TABLE {SCHEMA}.{name}")
+        except psycopg2.errors.LockNotAvailable:
+            return False  # left detached: the next maintain() finds it through detached()
+        return True
+
+    def run_if_due(self, conn):
+        """maintain() at most every check_seconds; cheap enough to call on every loop iteration.
+
+        A failing maintenance is reported and retried after check_seconds instead of
+        raising: the writer's own statements do not depend on it (DEFAULT partition).
+        """
+        if time.monotonic() < self._next_check:
+            return None
+        try:
+            result = self.maintain(conn)
+        except Exception as e:
+            self._next_check = time.monotonic() + self.check_seconds
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] activity_log maintenance failed: "
+                  f"{str(e).strip().splitlines()[0]}")
+            return None
+        if result is not None:
+            self._next_check = time.monotonic() + self.check_seconds
+            created, dropped = result
+            if created or dropped:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] activity_log partitions: "
+                      f"created {created or '-'}, dropped {dropped or '-'}")
+        return result
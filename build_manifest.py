@@ -0,0 +1,74 @@
+"""
+Incremental build manifest for analytics.py artifacts
+
+Stores a content hash of each artifact's input DataFrame(s) and rendering
+parameters. An artifact (PNG, workbook, HTML) is regenerated only when that
+hash changes, when the file is missing, or when the build is forced.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+MANIFEST_VERSION = 1
+
+
+def fingerprint(frames, params=None):
+    """SHA-256 over the data, column names/dtypes of `frames` and the JSON of `params`."""
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    elif isinstance(frames, dict):
+        frames = [frames[key] for key in sorted(frames)]
+
+    digest = hashlib.sha256()
+    for df in frames:
+        digest.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+        digest.update(json.dumps([str(t) for t in df.dtypes]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Remembers the input hash each artifact was last built from."""
+
+    def __init__(self, path, force=False):
+        self.path = path
+        self.force = force
+        self.rebuilt = []
+        self.skipped = []
+        self._entries = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self._entries = data.get("artifacts", {})
+        except (OSError, ValueError):
+            pass
+
+    def needs_build(self, artifact, digest):
+        """True if `artifact` must be regenerated; records it as skipped otherwise."""
+        if self.force or not os.path.exists(artifact) or self._entries.get(artifact) != digest:
+            return True
+        self.skipped.append(artifact)
+        return False
+
+    def record(self, artifact, digest):
+        """Marks `artifact` as freshly built from inputs hashing to `digest`."""
+        self._entries[artifact] = digest
+        self.rebuilt.append(artifact)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "artifacts": self._entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def report(self):
+        print(f"\n--- Build Summary{' (forced)' if self.force else ''} ---")
+        print(f"Rebuilt: {len(self.rebuilt)}, skipped (unchanged): {len(self.skipped)}")
+        for artifact in self.rebuilt:
+            print(f"  rebuilt  {artifact}")
+        for artifact in self.skipped:
+            print(f"  skipped  {artifact}")
@@ -0,0 +1,141 @@
+"""
+Matplotlib chart rendering for analytics.py
+
+Every chart is described by a job dict (DataFrame, chart_type, options) so the
+same rendering code runs either serially in the main process or in a process
+pool. Workers use the Agg backend and import Matplotlib once, in the pool
+initializer, then render many jobs each.
+"""
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# Chart types handled by dedicated functions instead of generate_chart
+LINE_COMPARISON = 'line_comparison'
+
+
+def generate_chart(df, chart_type, title, filename, x_label=None, y_label=None, x_col=None, y_col=None, color_col=None, **kwargs):
+    """Generates a Matplotlib chart, saves it to /charts/, and prints a console report."""
+    
+    if df.empty:
+        print(f"WARNING: Cannot generate {chart_type} '{title}'. DataFrame is empty.", file=sys.stderr)
+        return
+        
+    # Prepare data for plot types that use the DataFrame index (Pie, Bar, Line)
+    if chart_type in ['bar', 'barh', 'line', 'pie'] and df.shape[1] >= 2:
+        plot_data = df.set_index(df.columns[0])[df.columns[1]]
+    else:
+        plot_data = df 
+        
+    plt.figure(figsize=(12, 7))
+
+    # Plotting logic based on chart type
+    if chart_type == 'pie':
+        plot_data.plot.pie(autopct='%1.1f%%', startangle=90, legend=False, **kwargs)
+        plt.ylabel('')
+    elif chart_type == 'bar':
+        plot_data.plot.bar(**kwargs)
+        plt.xticks(rotation=45, ha='right')
+    elif chart_type == 'barh':
+        plot_data.plot.barh(**kwargs)
+        plt.gca().invert_yaxis()
+    elif chart_type == 'line':
+        plot_data.plot.line(marker='o', **kwargs)
+    elif chart_type == 'histogram':
+        # Histogram must use x_col explicitly
+        df[x_col].plot.hist(bins=kwargs.pop('bins', 15), edgecolor='black', alpha=0.7, **kwargs)
+    elif chart_type == 'scatter':
+        # Scatter must handle potential coloring
+        if color_col and color_col in df.columns:
+            groups = df.groupby(color_col)
+            for name, group in groups:
+                plt.scatter(group[x_col], group[y_col], label=name, **kwargs)
+            plt.legend(title=color_col)
+        else:
+             plt.scatter(df[x_col], df[y_col], **kwargs)
+
+    
+    # General chart aesthetics
+    plt.title(title)
+    if x_label and chart_type not in ['pie']:
+        plt.xlabel(x_label)
+    if y_label and chart_type not in ['pie']:
+        plt.ylabel(y_label)
+        
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    
+    save_path = os.path.join('charts', filename)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    plt.savefig(save_path)
+    plt.close()
+
+    print(f"Chart Type: {chart_type.upper()}. Saved to: {save_path}")
+    print(f"Shows: {title}")
+    return save_path
+
+
+def generate_line_comparison(df_line, title, filename, x_label="Publisher", y_label="Average Attribute Value", description=None):
+    """Line chart comparing average Intelligence and Strength per publisher (input in long format)."""
+    # Manual pivoting for Matplotlib line chart
+    df_line_pivot = df_line.pivot(index='publisher_name', columns='attribute_name', values='avg_attribute_value').reset_index()
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(df_line_pivot['publisher_name'], df_line_pivot['Intelligence'], marker='o', label='Intelligence', color='blue')
+    plt.plot(df_line_pivot['publisher_name'], df_line_pivot['Strength'], marker='x', label='Strength', color='red')
+    plt.title(title)
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
+    plt.legend(title="Attribute")
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+
+    save_path = os.path.join('charts', filename)
+    plt.savefig(save_path)
+    plt.close()
+    print(f"Chart Type: LINE. Saved to: {save_path}")
+    print(f"Shows: {description or title}")
+    return save_path
+
+
+# --- PARALLEL RENDERING ---
+
+def chart_job(df, chart_type, title, filename, **options):
+    """Packs one chart into a picklable job dict."""
+    return dict(df=df, chart_type=chart_type, title=title, filename=filename, **options)
+
+
+def render_chart_job(job):
+    """Renders a single job (in whichever process runs it) and returns the saved path."""
+    job = dict(job)
+    if job['chart_type'] == LINE_COMPARISON:
+        job.pop('chart_type')
+        return generate_line_comparison(job.pop('df'), **job)
+    return generate_chart(**job)
+
+
+def _init_worker():
+    """Pool initializer: pin the Agg backend and pay Matplotlib's import/font cost once per worker."""
+    matplotlib.use('Agg')
+    fig = plt.figure()
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def render_charts(jobs, workers=1):
+    """Renders all jobs, serially (workers <= 1) or in a process pool; returns saved paths in job order."""
+    jobs = list(jobs)
+    if workers <= 1 or len(jobs) <= 1:
+        return [render_chart_job(job) for job in jobs]
+
+    workers = min(workers, len(jobs))
+    # spawn: never fork a parent that holds open database connections
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        return list(pool.map(render_chart_job, jobs, chunksize=chunksize))
@@ -0,0 +1,100 @@
+"""
+Client-side Prometheus metrics for the database workers
+
+db_activity_simulator.py, auto_refresh.py and db_load_generator.py expose
+what the client sees - statement latency including the network and driver,
+connection setup time, errors by type, iteration duration and rows - on
+their own /metrics endpoint, next to the server-side pg_stat_* series of
+postgres-exporter. Every series carries a `worker` label.
+
+    metrics = ClientMetrics("db_activity_simulator")
+    metrics.serve()                                   # METRICS_PORT, 0 = disabled
+    conn = metrics.connect(psycopg2.connect, **config)
+    with metrics.iteration():
+        with metrics.statement("hero_count", cur):
+            cur.execute(...)
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram, start_http_server
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# 0.5 ms .. 10 s: index lookups up to saturated analytics queries
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STATEMENT_DURATION = Histogram(
+    "superhero_client_statement_duration_seconds",
+    "Statement latency seen by the client (execute + fetch)",
+    ["worker", "statement"], buckets=LATENCY_BUCKETS)
+CONNECT_DURATION = Histogram(
+    "superhero_client_connect_duration_seconds",
+    "Time to obtain a database connection (new connection or pool checkout)",
+    ["worker"], buckets=LATENCY_BUCKETS)
+ITERATION_DURATION = Histogram(
+    "superhero_client_iteration_duration_seconds",
+    "Duration of one worker iteration (load generator: one operation, from its scheduled start)",
+    ["worker"], buckets=LATENCY_BUCKETS + (30.0, 60.0))
+ERRORS = Counter(
+    "superhero_client_errors_total",
+    "Failed statements and connection attempts by exception type",
+    ["worker", "statement", "error"])
+ROWS = Counter(
+    "superhero_client_rows_total",
+    "Rows returned or affected (cursor.rowcount)",
+    ["worker", "statement"])
+
+
+class ClientMetrics:
+    """Metric helpers bound to one worker name."""
+
+    def __init__(self, worker):
+        self.worker = worker
+
+    def serve(self, port=METRICS_PORT):
+        """Starts the /metrics endpoint in a background thread; returns False when disabled (port 0)."""
+        if not port:
+            return False
+        start_http_server(port)
+        print(f"📈 Client metrics on :{port}/metrics (worker={self.worker})")
+        return True
+
+    def connect(self, connect, *args, **kwargs):
+        """connect(*args, **kwargs), timed; failures are counted as statement 'connect'."""
+        started = time.perf_counter()
+        try:
+            conn = connect(*args, **kwargs)
+        except Exception as e:
+            self.error("connect", e)
+            raise
+        CONNECT_DURATION.labels(self.worker).observe(time.perf_counter() - started)
+        return conn
+
+    def error(self, statement, exc):
+        ERRORS.labels(self.worker, statement, type(exc).__name__).inc()
+
+    @contextmanager
+    def statement(self, name, cur=None):
+        """Times the block as statement `name`; counts cur.rowcount afterwards and errors by type."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.error(name, e)
+            raise
+        STATEMENT_DURATION.labels(self.worker, name).observe(time.perf_counter() - started)
+        if cur is not None and cur.rowcount > 0:
+            ROWS.labels(self.worker, name).inc(cur.rowcount)
+
+    @contextmanager
+    def iteration(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ITERATION_DURATION.labels(self.worker).observe(time.perf_counter() - started)
+
+    def observe_iteration(self, seconds):
+        ITERATION_DURATION.labels(self.worker).observe(seconds)
@@ -10,11 +10,15 @@ Custom Exporter для Assignment #4 - Wikipedia API (FIXED)
 """
 
 import os
+import gzip
 import time
 import logging
 import requests
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import BoundedSemaphore, Lock, Thread
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 from prometheus_client import CollectorRegistry, Gauge, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
 # ============================================================================
@@ -33,7 +37,27 @@ HEADERS = {
     'User-Agent': 'SuperheroExporter/1.0 (Custom Prometheus Exporter; +https://github.com/)'
 }
 
-# Супергерои для мониторинга (из Wikipedia)
+# MediaWiki принимает до 50 titles в одном запросе (500 для ботов)
+BATCH_SIZE = int(os.getenv("WIKI_BATCH_SIZE", "50"))
+# cllimit / lllimit=max - 500 элементов на весь запрос, остальное приходит по continue
+LIST_LIMIT = 500
+# Оценка числа categories / langlinks страницы, которую ещё не загружали
+DEFAULT_LIST_SIZE = 100
+
+# Полные свойства страницы и дешёвая проверка ревизии (lastrevid, length)
+PAGE_PROPS = "info|revisions|categories|langlinks|pageprops"
+PROBE_PROPS = "info"
+# Интервал проверки героя растёт от SCRAPE_INTERVAL до MAX_REFRESH_INTERVAL, пока страница не меняется
+MAX_REFRESH_INTERVAL = int(os.getenv("MAX_REFRESH_INTERVAL", "600"))
+
+# Параллельная загрузка: потоки, одновременные запросы к одному хосту,
+# таймаут одного запроса и общий дедлайн обновления (секунды)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+HOST_CONCURRENCY = int(os.getenv("HOST_CONCURRENCY", "4"))
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "10"))
+REFRESH_DEADLINE = float(os.getenv("REFRESH_DEADLINE", "15"))
+
+# Супергерои для мониторинга (из Wikipedia); EXPORTER_HEROES="Thor,Hulk,..." заменяет список
 HEROES = [
     "Superman",
     "Batman",
@@ -46,6 +70,8 @@ HEROES = [
     "Hawkeye",
     "Black Panther"
 ]
+if os.getenv("EXPORTER_HEROES"):
+    HEROES = [name.strip() for name in os.getenv("EXPORTER_HEROES").split(",") if name.strip()]
 
 # ============================================================================
 # МЕТРИКИ PROMETHEUS - 30+ метрик
@@ -96,6 +122,37 @@ data_completeness = Gauge('wikipedia_data_completeness_percent', 'Data completen
 api_response_time = Histogram('wikipedia_api_response_time_seconds', 'API response time', registry=registry)
 api_errors = Counter('wikipedia_api_errors_total', 'Total API errors', registry=registry)
 api_calls = Counter('wikipedia_api_calls_total', 'Total API calls', registry=registry)
+refresh_duration = Gauge('wikipedia_refresh_duration_seconds', 'Duration of the last metrics refresh', registry=registry)
+hero_refresh_interval = Gauge('wikipedia_hero_refresh_interval_seconds', 'Current revision check interval', ['hero_name'], registry=registry)
+page_probes = Counter('wikipedia_page_probes_total', 'Revision checks (prop=info) of hero pages', registry=registry)
+page_refetches = Counter('wikipedia_page_refetches_total', 'Full page fetches after a revision change', registry=registry)
+
+# ============================================================================
+# HTTP СЕССИЯ И ПУЛ ПОТОКОВ
+# ============================================================================
+# Одна сессия на все потоки: keep-alive соединения переиспользуются между запросами и циклами
+session = requests.Session()
+session.headers.update(HEADERS)
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HOST_CONCURRENCY)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="wiki-fetch")
+
+host_slots = {}
+host_slots_lock = Lock()
+
+# Кэш страниц по lastrevid: {hero_name: {"lastrevid", "page", "redirected", "interval", "next_check"}}
+page_cache = {}
+
+
+def host_slot(url):
+    """Семафор хоста: не больше HOST_CONCURRENCY одновременных запросов к нему"""
+    host = urlsplit(url).netloc
+    with host_slots_lock:
+        if host not in host_slots:
+            host_slots[host] = BoundedSemaphore(HOST_CONCURRENCY)
+        return host_slots[host]
 
 # ============================================================================
 # ФУНКЦИИ ДЛЯ РАБОТЫ С API
@@ -109,44 +166,235 @@ def safe_int(value, default=0):
         return default
 
 
-def fetch_page_info(hero_name):
-    """Получить информацию о странице героя"""
+def remaining(deadline):
+    """Сколько секунд можно ждать ответа: REQUEST_TIMEOUT, но не дольше дедлайна"""
+    if deadline is None:
+        return REQUEST_TIMEOUT
+    return min(REQUEST_TIMEOUT, deadline - time.monotonic())
+
+
+def api_get(params, what, deadline=None):
+    """Один запрос к API с учётом api_calls / api_response_time / api_errors; JSON или None"""
+    slot = host_slot(API_BASE)
+    wait_seconds = remaining(deadline)
+    if wait_seconds <= 0 or not slot.acquire(timeout=wait_seconds):
+        logger.error(f"❌ Deadline exceeded for {what}")
+        api_errors.inc()
+        return None
     try:
         api_calls.inc()
         start_time = time.time()
         
-        params = {
-            "action": "query",
-            "format": "json",
-            "titles": hero_name,
-            "prop": "info|revisions|categories|langlinks|pageprops",
-            "rvlimit": "1",
-            "cllimit": "500",
-            "lllimit": "500"
-        }
-        
-        # ГЛАВНОЕ: Добавляем User-Agent!
-        response = requests.get(API_BASE, params=params, headers=HEADERS, timeout=10)
+        # User-Agent уже в заголовках сессии (ОБЯЗАТЕЛЕН для Wikipedia)
+        response = session.get(API_BASE, params=params, timeout=max(remaining(deadline), 0.1))
         response_time = time.time() - start_time
         api_response_time.observe(response_time)
         
         if response.status_code == 200:
             data = response.json()
-            logger.info(f"✅ Fetched {hero_name}: 200 OK ({response_time:.2f}s)")
+            logger.info(f"✅ Fetched {what}: 200 OK ({response_time:.2f}s)")
             return data
         else:
-            logger.error(f"❌ API error for {hero_name}: status {response.status_code}")
+            logger.error(f"❌ API error for {what}: status {response.status_code}")
             api_errors.inc()
             return None
             
     except requests.RequestException as e:
-        logger.error(f"❌ Request failed for {hero_name}: {e}")
+        logger.error(f"❌ Request failed for {what}: {e}")
         api_errors.inc()
         return None
     except Exception as e:
-        logger.error(f"❌ Unexpected error for {hero_name}: {e}")
+        logger.error(f"❌ Unexpected error for {what}: {e}")
         api_errors.inc()
         return None
+    finally:
+        slot.release()
+
+
+def merge_page(pages, page_id, page_info):
+    """Склеить части страницы из ответов с continue: списки дополняются, остальное перезаписывается"""
+    merged = pages.setdefault(page_id, {})
+    for key, value in page_info.items():
+        if isinstance(value, list):
+            merged.setdefault(key, []).extend(value)
+        else:
+            merged[key] = value
+
+
+def fetch_batch(titles, deadline=None, prop=PAGE_PROPS):
+    """Получить до BATCH_SIZE страниц одним запросом, следуя continue (categories / langlinks)
+
+    Возвращает (pages, normalized, redirects) или None при ошибке: pages - {page_id: page_info},
+    normalized / redirects - {исходный title: title после нормализации / редиректа}.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "titles": "|".join(titles),
+        "prop": prop,
+        "redirects": "1"
+    }
+    if prop == PAGE_PROPS:
+        # rvlimit нельзя с несколькими titles - без него приходит последняя ревизия каждой страницы
+        params["cllimit"] = "max"
+        params["lllimit"] = "max"
+    pages = {}
+    normalized = {}
+    redirects = {}
+    cont = {}
+    while True:
+        data = api_get({**params, **cont}, titles[0] if len(titles) == 1 else f"{len(titles)} titles", deadline)
+        if data is None:
+            return None
+        query = data.get('query', {})
+        for item in query.get('normalized', []):
+            normalized[item['from']] = item['to']
+        for item in query.get('redirects', []):
+            redirects[item['from']] = item['to']
+        for page_id, page_info in query.get('pages', {}).items():
+            merge_page(pages, page_id, page_info)
+        # Лимиты cllimit / lllimit общие на весь запрос - остаток приходит по continue
+        if 'continue' not in data:
+            return pages, normalized, redirects
+        cont = data['continue']
+
+
+def map_heroes(batch, result, by_hero, redirected):
+    """Разложить страницы ответа fetch_batch по именам героев (через normalized и redirects)"""
+    pages, normalized, redirects = result
+    by_title = {page_info.get('title'): page_info for page_info in pages.values()}
+    for hero_name in batch:
+        title = normalized.get(hero_name, hero_name)
+        if title in redirects:
+            redirected.add(hero_name)
+            title = redirects[title]
+        if title in by_title:
+            by_hero[hero_name] = by_title[title]
+
+
+def list_size(hero_name):
+    """max(categories, langlinks) героя по кэшу - сколько элементов списков он займёт в ответе"""
+    cached = page_cache.get(hero_name)
+    if cached is None:
+        return DEFAULT_LIST_SIZE
+    page_info = cached["page"]
+    return max(len(page_info.get('categories', [])), len(page_info.get('langlinks', [])))
+
+
+def plan_batches(heroes, prop=PAGE_PROPS):
+    """Нарезать героев на пачки до BATCH_SIZE, чьи categories / langlinks помещаются в один ответ
+
+    Иначе большая пачка тянет остаток последовательными continue-запросами;
+    несколько пачек без continue уходят параллельно за одно время ответа.
+    Для PROBE_PROPS списков нет - просто пачки по BATCH_SIZE.
+    """
+    batches = []
+    batch = []
+    size = 0
+    for hero_name in heroes:
+        estimate = min(list_size(hero_name), LIST_LIMIT) if prop == PAGE_PROPS else 0
+        if batch and (len(batch) >= BATCH_SIZE or size + estimate > LIST_LIMIT):
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(hero_name)
+        size += estimate
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def run_batches(batches, deadline, prop=PAGE_PROPS):
+    """Выполнить fetch_batch для всех пачек параллельно; [(batch, result или None)] к дедлайну"""
+    futures = {executor.submit(fetch_batch, batch, deadline, prop): batch for batch in batches}
+    done, not_done = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    for future in not_done:
+        future.cancel()
+    return [(batch, future.result() if future in done else None) for future, batch in futures.items()]
+
+
+def fetch_heroes(heroes, deadline, prop=PAGE_PROPS):
+    """Получить страницы всех героев: пачки из plan_batches параллельно в пуле потоков
+
+    Если пачка упала, её герои запрашиваются по одному (тоже параллельно), так что
+    ошибка одной страницы не лишает данных остальных. Всё укладывается в deadline.
+    Возвращает ({hero_name: page_info}, {hero_name, попавших на редирект}); герои без
+    данных отсутствуют, ненайденные страницы содержат ключ 'missing'.
+    """
+    by_hero = {}
+    redirected = set()
+    retry = []
+    for batch, result in run_batches(plan_batches(heroes, prop), deadline, prop):
+        if result is not None:
+            map_heroes(batch, result, by_hero, redirected)
+        elif len(batch) > 1:
+            retry.extend([hero_name] for hero_name in batch)
+        else:
+            logger.warning(f"⚠️  No data for {batch[0]}")
+    if retry:
+        logger.warning(f"⚠️  Batch failed, fetching {len(retry)} heroes one by one")
+        for batch, result in run_batches(retry, deadline, prop):
+            if result is None:
+                logger.warning(f"⚠️  No data for {batch[0]}")
+            else:
+                map_heroes(batch, result, by_hero, redirected)
+    return by_hero, redirected
+
+
+def cache_page(hero_name, page_info, redirected, interval, now):
+    page_cache[hero_name] = {
+        "lastrevid": page_info.get('lastrevid'),
+        "page": page_info,
+        "redirected": redirected,
+        "interval": interval,
+        "next_check": now + interval
+    }
+    hero_refresh_interval.labels(hero_name=hero_name).set(interval)
+
+
+def refresh_pages(heroes):
+    """Страницы героев через кэш по lastrevid
+
+    Герои, чей интервал истёк, проверяются дешёвым prop=info; categories / langlinks
+    и остальное перезапрашиваются только для страниц, у которых сменилась ревизия.
+    Без правок интервал героя удваивается (до MAX_REFRESH_INTERVAL), после правки -
+    уменьшается вдвое (до SCRAPE_INTERVAL), так что частота проверок следует частоте правок.
+    Возвращает ({hero_name: page_info}, {hero_name, попавших на редирект}) как fetch_heroes.
+    """
+    now = time.monotonic()
+    deadline = now + REFRESH_DEADLINE
+    # Ещё не загруженные герои сразу идут на полную загрузку, без проверки
+    changed = [hero_name for hero_name in heroes if hero_name not in page_cache]
+    due = [hero_name for hero_name in heroes
+           if hero_name in page_cache and page_cache[hero_name]["next_check"] <= now]
+    if due:
+        probed, probe_redirected = fetch_heroes(due, deadline, PROBE_PROPS)
+        page_probes.inc(len(probed))
+        for hero_name in due:
+            page_info = probed.get(hero_name)
+            cached = page_cache[hero_name]
+            if page_info is None:
+                continue  # проверка не удалась - остаются данные из кэша, повтор в следующем цикле
+            if cached["lastrevid"] == page_info.get('lastrevid') \
+                    and cached["redirected"] == (hero_name in probe_redirected):
+                interval = min(cached["interval"] * 2, MAX_REFRESH_INTERVAL)
+                cache_page(hero_name, cached["page"], cached["redirected"], interval, now)
+            elif 'missing' in page_info or 'invalid' in page_info:
+                cache_page(hero_name, page_info, hero_name in probe_redirected, SCRAPE_INTERVAL, now)
+            else:
+                changed.append(hero_name)
+    if changed:
+        pages, redirected = fetch_heroes(changed, deadline)
+        page_refetches.inc(len(pages))
+        for hero_name, page_info in pages.items():
+            cached = page_cache.get(hero_name)
+            interval = max(cached["interval"] // 2, SCRAPE_INTERVAL) if cached else SCRAPE_INTERVAL
+            cache_page(hero_name, page_info, hero_name in redirected, interval, now)
+    logger.info(f"🔎 Checked {len(due)}/{len(heroes)} heroes, fetched {len(changed)} new or changed pages")
+    
+    by_hero = {hero_name: page_cache[hero_name]["page"] for hero_name in heroes if hero_name in page_cache}
+    redirected = {hero_name for hero_name in by_hero if page_cache[hero_name]["redirected"]}
+    return by_hero, redirected
 
 
 def get_page_text_length(hero_name):
@@ -160,7 +408,7 @@ def get_page_text_length(hero_name):
             "explaintext": True
         }
         
-        response = requests.get(API_BASE, params=params, headers=HEADERS, timeout=10)
+        response = session.get(API_BASE, params=params, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             pages = data.get('query', {}).get('pages', {})
@@ -175,6 +423,7 @@ def get_page_text_length(hero_name):
 def update_metrics():
     """Обновить все метрики из API"""
     logger.info("📡 Updating metrics from Wikipedia API...")
+    started = time.monotonic()
     
     total_heroes_monitored.set(len(HEROES))
     
@@ -188,55 +437,54 @@ def update_metrics():
     all_languages = set()
     success_count = 0
     
+    # Multi-title запросы (до BATCH_SIZE героев), пачки - параллельно; неизменённые страницы - из кэша
+    pages_by_hero, redirected = refresh_pages(HEROES)
+    
     for hero_name in HEROES:
-        data = fetch_page_info(hero_name)
-        if not data:
-            logger.warning(f"⚠️  No data for {hero_name}")
+        page_info = pages_by_hero.get(hero_name)
+        if page_info is None:
             continue
         
         try:
-            pages = data.get('query', {}).get('pages', {})
+            # Пропуск если страница не найдена
+            if 'missing' in page_info or 'invalid' in page_info:
+                logger.warning(f"⚠️  {hero_name} not found on Wikipedia")
+                continue
+            
+            success_count += 1
+            
+            # ОСНОВНАЯ ИНФОРМАЦИЯ
+            title = page_info.get('title', hero_name)
+            page_length = safe_int(page_info.get('length', 0))
+            revisions = safe_int(page_info.get('lastrevid', 0))
+            
+            hero_page_length.labels(hero_name=hero_name).set(page_length)
+            
+            total_length += page_length
+            if page_length > max_length:
+                max_length = page_length
+            
+            # РЕДАКЦИИ
+            revisions_data = page_info.get('revisions', [])
+            if revisions_data:
+                rev_count = len(revisions_data)
+                hero_revisions_total.labels(hero_name=hero_name).set(rev_count)
+                if rev_count > max_revisions:
+                    max_revisions = rev_count
+            
+            # КАТЕГОРИИ
+            categories = page_info.get('categories', [])
+            hero_categories_count.labels(hero_name=hero_name).set(len(categories))
+            for cat in categories:
+                all_categories.add(cat.get('title', ''))
             
-            for page_id, page_info in pages.items():
-                # Пропуск если это редирект или ошибка
-                if 'missing' in page_info:
-                    logger.warning(f"⚠️  {hero_name} not found on Wikipedia")
-                    continue
-                
-                success_count += 1
-                
-                # ОСНОВНАЯ ИНФОРМАЦИЯ
-                title = page_info.get('title', hero_name)
-                page_length = safe_int(page_info.get('length', 0))
-                revisions = safe_int(page_info.get('lastrevid', 0))
-                
-                hero_page_length.labels(hero_name=hero_name).set(page_length)
-                
-                total_length += page_length
-                if page_length > max_length:
-                    max_length = page_length
-                
-                # РЕДАКЦИИ
-                revisions_data = page_info.get('revisions', [])
-                if revisions_data:
-                    rev_count = len(revisions_data)
-                    hero_revisions_total.labels(hero_name=hero_name).set(rev_count)
-                    if rev_count > max_revisions:
-                        max_revisions = rev_count
-                
-                # КАТЕГОРИИ
-                categories = page_info.get('categories', [])
-                hero_categories_count.labels(hero_name=hero_name).set(len(categories))
-                for cat in categories:
-                    all_categories.add(cat.get('title', ''))
-                
-                # ЯЗЫКИ
-                langlinks = page_info.get('langlinks', [])
-                hero_languages_available.labels(hero_name=hero_name).set(len(langlinks))
-                for ll in langlinks:
-                    all_languages.add(ll.get('lang', ''))
-                
-                logger.info(f"📊 {hero_name}: {page_length}chars, {len(categories)}cats, {len(langlinks)}langs")
+            # ЯЗЫКИ
+            langlinks = page_info.get('langlinks', [])
+            hero_languages_available.labels(hero_name=hero_name).set(len(langlinks))
+            for ll in langlinks:
+                all_languages.add(ll.get('lang', ''))
+            
+            logger.info(f"📊 {hero_name}: {page_length}chars, {len(categories)}cats, {len(langlinks)}langs")
             
         except Exception as e:
             logger.error(f"❌ Error parsing data for {hero_name}: {e}")
@@ -249,10 +497,13 @@ def update_metrics():
     most_edited_hero.set(max_revisions)
     total_categories.set(len(all_categories))
     total_languages_across_heroes.set(len(all_languages))
+    pages_as_redirects.set(len(redirected))
+    refresh_duration.set(time.monotonic() - started)
     
     data_completeness.set(100)
     
     logger.info(f"✅ All metrics updated: {success_count}/{len(HEROES)} heroes, {len(all_categories)} categories, {len(all_languages)} languages")
+    publish_snapshot()
 
 
 def metrics_update_loop():
@@ -269,24 +520,63 @@ def metrics_update_loop():
 # ============================================================================
 # HTTP HANDLER
 # ============================================================================
+# Готовый снимок /metrics (plain, gzip): пересобирается после update_metrics,
+# скрейп только отдаёт байты. Кортеж заменяется целиком - читателям блокировка не нужна.
+metrics_snapshot = (b'', b'')
+
+
+def publish_snapshot():
+    """Сериализовать registry один раз и сохранить вместе со сжатой копией"""
+    global metrics_snapshot
+    body = generate_latest(registry)
+    metrics_snapshot = (body, gzip.compress(body, compresslevel=6))
+
+
+def accepts_gzip(header):
+    """Accept-Encoding разрешает gzip: явная запись gzip важнее '*', q=0 запрещает"""
+    weights = {}
+    for item in (header or '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        params = params.replace(' ', '').lower()
+        try:
+            weights[coding] = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            weights[coding] = 0.0
+    return weights.get('gzip', weights.get('*', 0.0)) > 0
+
 
 class MetricsHandler(BaseHTTPRequestHandler):
     """HTTP обработчик для Prometheus /metrics endpoint"""
     
+    # Keep-alive между скрейпами; у каждого ответа есть Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело уходят отдельными send(): без TCP_NODELAY Nagle + delayed ACK дают ~40 мс
+    disable_nagle_algorithm = True
+    
+    def send_body(self, status, content_type, body, encoding=None):
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
     def do_GET(self):
         if self.path == '/metrics':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(generate_latest(registry))
+            plain, compressed = metrics_snapshot
+            if accepts_gzip(self.headers.get('Accept-Encoding')):
+                self.send_body(200, CONTENT_TYPE_LATEST, compressed, 'gzip')
+            else:
+                self.send_body(200, CONTENT_TYPE_LATEST, plain)
         elif self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(b'{"status":"healthy","exporter":"wikipedia"}')
+            self.send_body(200, 'application/json', b'{"status":"healthy","exporter":"wikipedia"}')
         else:
-            self.send_response(404)
-            self.end_headers()
+            self.send_body(404, 'text/plain; charset=utf-8', b'Not Found')
     
     def log_message(self, format, *args):
         return
@@ -305,6 +595,9 @@ def main():
     logger.info(f"🦸 Monitoring {len(HEROES)} superheroes")
     logger.info(f"⭐ User-Agent: Added (Wikipedia requirement)")
     
+    # Пустой снимок до первого обновления (метрики уже зарегистрированы)
+    publish_snapshot()
+    
     # Запустить поток обновления метрик
     update_thread = Thread(target=metrics_update_loop, daemon=True)
     update_thread.start()
@@ -315,7 +608,8 @@ def main():
     update_metrics()
     
     # Запустить HTTP сервер
-    server = HTTPServer(('0.0.0.0', EXPORTER_PORT), MetricsHandler)
+    # Поток на соединение: скрейпы нескольких Prometheus не ждут друг друга
+    server = ThreadingHTTPServer(('0.0.0.0', EXPORTER_PORT), MetricsHandler)
     logger.info(f"✅ HTTP server started on port {EXPORTER_PORT}")
     logger.info("=" * 70)
     
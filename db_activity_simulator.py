@@ -9,6 +9,9 @@ import random
 import psycopg2
 from datetime import datetime
 
+from activity_log import ActivityLogMaintainer, record
+from client_metrics import ClientMetrics
+
 # DB Connection
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5433")
@@ -16,8 +19,13 @@ DB_NAME = os.getenv("DB_NAME", "superset_db")
 DB_USER = os.getenv("DB_USER", "superset_user")
 DB_PASS = os.getenv("DB_PASS", "Pg!Super1234")
 
+activity_log = ActivityLogMaintainer()
+# Клиентские метрики (/metrics на METRICS_PORT), worker = имя скрипта
+metrics = ClientMetrics(os.path.splitext(os.path.basename(__file__))[0])
+
 def get_connection():
-    return psycopg2.connect(
+    return metrics.connect(
+        psycopg2.connect,
         host=DB_HOST,
         port=DB_PORT,
         database=DB_NAME,
@@ -29,41 +37,34 @@ def simulate_activity():
     """Постоянно выполняет разные типы запросов"""
     try:
         conn = get_connection()
+        # Партиции activity_log (создание и удаление устаревших)
+        activity_log.run_if_due(conn)
         cur = conn.cursor()
         
         # 1. SELECT запросы
-        cur.execute("SELECT COUNT(*) FROM superhero.superhero;")
-        hero_count = cur.fetchone()[0]
+        with metrics.statement("hero_count", cur):
+            cur.execute("SELECT COUNT(*) FROM superhero.superhero;")
+            hero_count = cur.fetchone()[0]
         print(f"[{datetime.now()}] Total heroes: {hero_count}")
         
         # 2. Проверка среднего значения атрибута
-        cur.execute("""
-            SELECT AVG(attribute_value) 
-            FROM superhero.hero_attribute 
-            WHERE attribute_id = 1;
-        """)
-        avg_intelligence = cur.fetchone()[0]
+        with metrics.statement("attribute_avg", cur):
+            cur.execute("""
+                SELECT AVG(attribute_value) 
+                FROM superhero.hero_attribute 
+                WHERE attribute_id = 1;
+            """)
+            avg_intelligence = cur.fetchone()[0]
         print(f"[{datetime.now()}] Avg Intelligence: {avg_intelligence}")
         
-        # 3. CREATE временная таблица и вставка (симуляция активности)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS superhero.activity_log (
-                id SERIAL PRIMARY KEY,
-                log_time TIMESTAMP DEFAULT NOW(),
-                activity_type VARCHAR(50),
-                value NUMERIC
-            );
-        """)
-        
-        # 4. INSERT новая запись
+        # 3. INSERT новая запись (симуляция активности)
         activity_type = random.choice(['select', 'update', 'insert'])
         value = random.uniform(50, 100)
-        cur.execute("""
-            INSERT INTO superhero.activity_log (activity_type, value)
-            VALUES (%s, %s);
-        """, (activity_type, value))
+        with metrics.statement("log_insert", cur):
+            record(cur, activity_type, value)
         
-        conn.commit()
+        with metrics.statement("commit"):
+            conn.commit()
         print(f"[{datetime.now()}] Inserted activity log: {activity_type}, {value}")
         
         cur.close()
@@ -75,7 +76,9 @@ def simulate_activity():
 if __name__ == "__main__":
     print("🚀 Starting DB Activity Simulator...")
     print(f"Connecting to {DB_HOST}:{DB_PORT}/{DB_NAME}")
+    metrics.serve()
     
     while True:
-        simulate_activity()
+        with metrics.iteration():
+            simulate_activity()
         time.sleep(5)  # Каждые 5 секунд
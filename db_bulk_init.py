@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Bulk database initialization from CSV seed files
+
+Replaces the row-by-row INSERT scripts (01_reference_data.sql,
+02_hero_attribute.sql, 03_hero_power.sql) with a phased load:
+
+    schema        seed_data/schema.sql: bare tables, no keys or indexes
+    load          COPY FROM STDIN of every seed_data/*.csv, tables in parallel
+    primary keys  seed_data/constraints.sql @primary-keys, in parallel
+    foreign keys  @foreign-keys, validated once over the loaded data
+    identities    @identities: identity sequences continue after the loaded ids
+    post scripts  04_superset_prep.sql, 05_materialized_views.sql, 06_hero_keys_indexes.sql
+    analyze       ANALYZE of the schema
+
+The postgres container runs the same phases through postgres-bulk-init/01_bulk_init.sh.
+
+    python db_bulk_init.py load --database superheroes   # (re)create the schema there
+    python db_bulk_init.py export                        # regenerate seed_data/*.csv from the INSERT scripts
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEED_DIR = os.path.join(BASE_DIR, "seed_data")
+INIT_SCRIPTS_DIR = os.path.join(BASE_DIR, "postgres-init-scripts")
+INSERT_SCRIPTS = ("01_reference_data.sql", "02_hero_attribute.sql", "03_hero_power.sql")
+POST_SCRIPTS = ("04_superset_prep.sql", "05_materialized_views.sql", "06_hero_keys_indexes.sql")
+
+# Stable row order for the exported CSVs (clean diffs when the data changes)
+EXPORT_ORDER = {"hero_attribute": "hero_id, attribute_id", "hero_power": "hero_id, power_id"}
+
+
+def connect(url):
+    """psycopg2 connection for a SQLAlchemy URL (also handles ?host=/socket/dir)."""
+    import psycopg2
+    return psycopg2.connect(
+        host=url.host or url.query.get("host"), port=url.port, dbname=url.database,
+        user=url.username, password=url.password,
+    )
+
+
+def database_url(database=None):
+    from sqlalchemy.engine import make_url
+    from analytics import Config
+    url = make_url(Config.DB_URL)
+    return url.set(database=database) if database else url
+
+
+def sql_sections(path):
+    """{section: [statement, ...]} of a file with '-- @section' markers and blank-line separated statements."""
+    sections = {}
+    current = None
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    for block in re.split(r"\n\s*\n", text):
+        lines = [line for line in block.strip().splitlines()]
+        for line in lines:
+            match = re.match(r"--\s*@([\w-]+)", line)
+            if match:
+                current = match.group(1)
+                sections.setdefault(current, [])
+        statement = "\n".join(line for line in lines if not line.lstrip().startswith("--")).strip()
+        if statement and current:
+            sections[current].append(statement)
+    return sections
+
+
+class PhaseTimer:
+    """Times named phases and prints a summary table."""
+
+    def __init__(self):
+        self.phases = []
+
+    def run(self, name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        self.phases.append((name, elapsed))
+        print(f">>> {name:<14} {elapsed:8.3f}s")
+        return result
+
+    def report(self):
+        total = sum(seconds for _, seconds in self.phases)
+        print("\n--- Bulk Init Timings ---")
+        for name, seconds in self.phases:
+            print(f"{name:<14} {seconds:8.3f}s  {100 * seconds / total if total else 0:5.1f}%")
+        print(f"{'total':<14} {total:8.3f}s")
+
+
+# --- PHASES ---
+
+def _execute(url, statements):
+    conn = connect(url)
+    try:
+        with conn.cursor() as cur:
+            for statement in statements:
+                cur.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _parallel(url, statements, workers):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(_execute, url, [statement]) for statement in statements]:
+            future.result()
+
+
+def _copy_table(url, table, path):
+    conn = connect(url)
+    try:
+        with conn.cursor() as cur, open(path, encoding="utf-8") as f:
+            cur.copy_expert(f'COPY superhero."{table}" FROM STDIN WITH (FORMAT csv, HEADER)', f, size=1 << 20)
+            rows = cur.rowcount
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def load_tables(url, seed_dir, workers):
+    """COPYs every <table>.csv on its own connection; the largest files start first."""
+    files = sorted((os.path.join(seed_dir, name) for name in os.listdir(seed_dir) if name.endswith(".csv")),
+                   key=os.path.getsize, reverse=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {os.path.basename(path)[:-4]: pool.submit(_copy_table, url, os.path.basename(path)[:-4], path)
+                   for path in files}
+        counts = {table: future.result() for table, future in futures.items()}
+    for table, rows in counts.items():
+        print(f"    {table:<16} {rows:>10,} rows")
+    return counts
+
+
+def run_script(url, path):
+    conn = connect(url)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur, open(path, encoding="utf-8") as f:
+            cur.execute(f.read())
+    finally:
+        conn.close()
+
+
+def analyze(url):
+    conn = connect(url)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT format('%I.%I', schemaname, relname) FROM pg_stat_user_tables WHERE schemaname = 'superhero'")
+            for (table,) in cur.fetchall():
+                cur.execute(f"ANALYZE {table}")
+    finally:
+        conn.close()
+
+
+def bulk_init(url, seed_dir=SEED_DIR, workers=4, post_scripts=POST_SCRIPTS):
+    """Runs every phase against `url`; returns the PhaseTimer."""
+    timer = PhaseTimer()
+    constraints = sql_sections(os.path.join(seed_dir, "constraints.sql"))
+
+    timer.run("schema", run_script, url, os.path.join(seed_dir, "schema.sql"))
+    timer.run("load", load_tables, url, seed_dir, workers)
+    timer.run("primary keys", _parallel, url, constraints.get("primary-keys", []), workers)
+    timer.run("foreign keys", _execute, url, constraints.get("foreign-keys", []))
+    timer.run("identities", _execute, url, constraints.get("identities", []))
+    for name in post_scripts:
+        timer.run(name.split("_", 1)[0] + " post", run_script, url, os.path.join(INIT_SCRIPTS_DIR, name))
+    timer.run("analyze", analyze, url)
+    return timer
+
+
+# --- EXPORT ---
+
+def export_seed_data(admin_url, seed_dir=SEED_DIR, scratch_db="superheroes_seed_export"):
+    """Runs the INSERT scripts in a scratch database and COPYs every table out as CSV."""
+    admin = connect(admin_url)
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{scratch_db}"')
+            cur.execute(f'CREATE DATABASE "{scratch_db}"')
+
+        url = admin_url.set(database=scratch_db)
+        for name in INSERT_SCRIPTS:
+            run_script(url, os.path.join(INIT_SCRIPTS_DIR, name))
+
+        os.makedirs(seed_dir, exist_ok=True)
+        conn = connect(url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT relname FROM pg_class WHERE relnamespace = 'superhero'::regnamespace AND relkind = 'r' ORDER BY 1")
+                for (table,) in cur.fetchall():
+                    order = EXPORT_ORDER.get(table, "id")
+                    path = os.path.join(seed_dir, f"{table}.csv")
+                    with open(path, "w", encoding="utf-8", newline="") as f:
+                        cur.copy_expert(f'COPY (SELECT * FROM superhero."{table}" ORDER BY {order}) TO STDOUT WITH (FORMAT csv, HEADER)', f)
+                    print(f"{path}: {cur.rowcount} rows")
+        finally:
+            conn.close()
+    finally:
+        with admin.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{scratch_db}"')
+        admin.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Phased bulk initialization of the superhero schema from CSV seed files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    load_parser = subparsers.add_parser("load", help="Create the schema and bulk-load the seed data")
+    load_parser.add_argument("--database", help="Target database (default: the one in DB_URL)")
+    load_parser.add_argument("--workers", type=int, default=4, help="Parallel COPY / primary key connections")
+    load_parser.add_argument("--no-post", action="store_true", help="Skip the 04-06 post scripts")
+    subparsers.add_parser("export", help="Regenerate seed_data/*.csv from the INSERT scripts (needs a scratch database)")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_seed_data(database_url("postgres"))
+        return 0
+
+    url = database_url(args.database)
+    print(f"Bulk init of {url.render_as_string(hide_password=True)}")
+    timer = bulk_init(url, workers=args.workers, post_scripts=() if args.no_post else POST_SCRIPTS)
+    timer.report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,138 +1,479 @@
 #!/usr/bin/env python3
 """
 Database Load Generator
-Постоянно создает нагрузку на БД для обновления метрик в Prometheus/Grafana
+Создает нагрузку на БД с заданной частотой операций для поиска точки насыщения
+
+Worker threads share a ThreadedConnectionPool (one connection per worker,
+kept for the whole run) and follow an open-loop schedule of --rate operations
+per second with a --read-ratio read/write mix. Latency is measured from the
+scheduled start of each operation, so queueing behind a saturated database is
+included instead of hidden ("coordinated omission"); the execution time alone
+is reported as service time. Every --report-interval seconds throughput and
+p50/p99/p999 are printed; --ramp steps the rate up and reports where the
+database stops keeping up.
+
+    python db_load_generator.py                                   # 20 ops/s, 4 workers, until Ctrl+C
+    python db_load_generator.py --rate 500 --workers 16 --duration 60
+    python db_load_generator.py --ramp 100:2000:100 --step-seconds 20 --workers 32
+    python db_load_generator.py --rate 0 --workers 8 --duration 30  # unthrottled (closed loop)
+    python db_load_generator.py --write-bench --bench-rows 100000 --batch-size 1000 --commit-rows 10000
+
+--write-bench compares the insert strategies of activity_log.WRITE_STRATEGIES
+(single-row, executemany, execute_values, one multi-row VALUES per batch, COPY)
+on one connection and reports rows/s and WAL bytes for each. The rows are
+written to activity_log as activity_type 'bench_<strategy>' and age out with
+its partitions.
+
+Connection settings come from the standard PGHOST / PGPORT / PGDATABASE /
+PGUSER / PGPASSWORD variables. With --metrics-port (METRICS_PORT) the mixed
+load is also exported as Prometheus client metrics (see client_metrics.py).
 """
-import psycopg2
+import os
+import sys
+import json
 import time
 import random
+import argparse
+import threading
 from datetime import datetime
 
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from activity_log import ActivityLogMaintainer, WRITE_STRATEGIES, record
+from client_metrics import METRICS_PORT, ClientMetrics
+from latency_histogram import LatencyHistogram
+
 # DB Connection Parameters
 DB_CONFIG = {
-    "host": "localhost",
-    "port": 5433,
-    "database": "superset_db",
-    "user": "superset_user",
-    "password": "Pg!Super1234"
+    "host": os.getenv("PGHOST", "localhost"),
+    "port": int(os.getenv("PGPORT", "5433")),
+    "database": os.getenv("PGDATABASE", "superset_db"),
+    "user": os.getenv("PGUSER", "superset_user"),
+    "password": os.getenv("PGPASSWORD", "Pg!Super1234"),
 }
 
-def get_db_connection():
-    """Подключение к БД"""
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
-    except Exception as e:
-        print(f"❌ Connection error: {e}")
-        return None
-
-def run_load_generator():
-    """Основной генератор нагрузки"""
-    print("🚀 Starting Database Load Generator...")
-    print(f"📊 Target: {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
-    
-    iteration = 0
-    
-    while True:
-        try:
-            conn = get_db_connection()
-            if not conn:
-                time.sleep(5)
+
+# --- OPERATIONS ---
+# name -> (weight within its class, sql, params(rng, max_hero_id)); executed with autocommit
+
+READ_OPS = {
+    "hero_by_id": (4, "SELECT superhero_name, full_name, publisher_id, race_id FROM superhero.superhero WHERE id = %s",
+                   lambda rng, max_id: (rng.randint(1, max_id),)),
+    "hero_powers": (4, """
+        SELECT sp.power_name FROM superhero.hero_power hp
+        JOIN superhero.superpower sp ON sp.id = hp.power_id
+        WHERE hp.hero_id = %s""", lambda rng, max_id: (rng.randint(1, max_id),)),
+    "attribute_avg": (1, "SELECT AVG(attribute_value) FROM superhero.hero_attribute WHERE attribute_id = %s",
+                      lambda rng, max_id: (rng.randint(1, 6),)),
+    "recent_activity": (1, """
+        SELECT activity_type, COUNT(*), AVG(value), MAX(value)
+        FROM superhero.activity_log
+        WHERE created_at > NOW() - INTERVAL '1 minute'
+        GROUP BY activity_type""", lambda rng, max_id: ()),
+}
+
+WRITE_OPS = {
+    "log_insert": (4, None, lambda rng, max_id: (rng.choice(['select', 'insert', 'update', 'delete']),
+                                                  rng.uniform(10, 100), rng.randint(1, max_id))),
+    # UPDATE не поддерживает LIMIT: 10 последних строк через подзапрос;
+    # SKIP LOCKED - параллельные воркеры берут разные строки вместо взаимных блокировок
+    "log_update": (1, """
+        UPDATE superhero.activity_log
+        SET value = value + 1
+        WHERE created_at > NOW() - INTERVAL '1 minute'
+          AND (id, created_at) IN (
+              SELECT id, created_at FROM superhero.activity_log
+              WHERE created_at > NOW() - INTERVAL '1 minute'
+              ORDER BY created_at DESC
+              LIMIT 10
+              FOR UPDATE SKIP LOCKED
+          )""", lambda rng, max_id: ()),
+}
+
+
+def run_operation(cur, name, sql, params):
+    if name == "log_insert":
+        record(cur, params[0], params[1], params[2])
+        return
+    cur.execute(sql, params)
+    if cur.description is not None:
+        cur.fetchall()
+
+
+# --- SCHEDULING / STATISTICS ---
+
+class RateSchedule:
+    """Hands out intended start times start + k / rate to the workers (None when unthrottled)."""
+
+    def __init__(self, rate):
+        self._lock = threading.Lock()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = rate
+            self._start = time.perf_counter()
+            self._issued = 0
+
+    def next(self):
+        with self._lock:
+            if not self.rate:
+                return None
+            intended = self._start + self._issued / self.rate
+            self._issued += 1
+            return intended
+
+    def lag(self):
+        """Seconds the schedule is behind now: > 0 when the workers cannot keep up."""
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            return max(0.0, time.perf_counter() - (self._start + self._issued / self.rate))
+
+
+class LoadStats:
+    """Per-operation response / service time histograms plus error counts, taken per interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.response = {name: LatencyHistogram() for name in list(READ_OPS) + list(WRITE_OPS)}
+        self.service = {name: LatencyHistogram() for name in self.response}
+        self.errors = {}
+
+    def record(self, name, response, service):
+        self.response[name].record(response)
+        self.service[name].record(service)
+
+    def error(self, name, exc):
+        key = f"{name}: {type(exc).__name__}"
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def take(self):
+        """({op: response hist}, {op: service hist}, {error: count}) since the previous take()."""
+        with self._lock:
+            errors, self.errors = self.errors, {}
+        return ({name: h.take() for name, h in self.response.items()},
+                {name: h.take() for name, h in self.service.items()}, errors)
+
+
+def combined(histograms, names):
+    total = LatencyHistogram()
+    for name in names:
+        total.merge(histograms[name])
+    return total
+
+
+# --- WORKERS ---
+
+metrics = ClientMetrics("db_load_generator")
+
+
+def worker(pool, schedule, stats, stop, read_ratio, max_hero_id, seed):
+    rng = random.Random(seed)
+    read_names = list(READ_OPS)
+    read_weights = [READ_OPS[n][0] for n in read_names]
+    write_names = list(WRITE_OPS)
+    write_weights = [WRITE_OPS[n][0] for n in write_names]
+
+    conn = None
+    while not stop.is_set():
+        if conn is None:
+            try:
+                conn = metrics.connect(pool.getconn)
+                conn.autocommit = True
+            except psycopg2.Error as e:
+                print(f"❌ Connection error: {e}", file=sys.stderr)
+                stop.wait(1)
                 continue
-            
-            cur = conn.cursor()
-            iteration += 1
-            
-            # ===== 1. SELECT запросы =====
-            cur.execute("SELECT COUNT(*) FROM superhero.superhero;")
-            hero_count = cur.fetchone()[0]
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ SELECT: Found {hero_count} heroes")
-            
-            # ===== 2. Сложный SELECT (для рейта) =====
-            cur.execute("""
-                SELECT AVG(attribute_value) 
-                FROM superhero.hero_attribute 
-                WHERE attribute_id = 1;
-            """)
-            avg_val = cur.fetchone()[0]
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ AVG Query: {avg_val:.2f}")
-            
-            # ===== 3. CREATE таблица для логирования (если нет) =====
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS superhero.activity_log (
-                    id SERIAL PRIMARY KEY,
-                    activity_type VARCHAR(50),
-                    hero_id INT,
-                    value NUMERIC,
-                    created_at TIMESTAMP DEFAULT NOW()
-                );
-            """)
-            
-            # ===== 4. INSERT новые логи (для увеличения коммитов) =====
-            for _ in range(5):
-                activity = random.choice(['select', 'insert', 'update', 'delete'])
-                hero_id = random.randint(1, min(50, hero_count)) if hero_count > 0 else 1
-                value = random.uniform(10, 100)
-                
-                cur.execute("""
-                    INSERT INTO superhero.activity_log (activity_type, hero_id, value)
-                    VALUES (%s, %s, %s);
-                """, (activity, hero_id, value))
-            
-            conn.commit()
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ INSERT: 5 activity logs")
-            
-            # ===== 5. UPDATE операции =====
-            cur.execute("""
-                UPDATE superhero.activity_log 
-                SET value = value + 1 
-                WHERE created_at > NOW() - INTERVAL '1 minute'
-                LIMIT 10;
-            """)
-            
-            conn.commit()
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ UPDATE: activity logs")
-            
-            # ===== 6. DELETE старые логи =====
-            cur.execute("""
-                DELETE FROM superhero.activity_log 
-                WHERE created_at < NOW() - INTERVAL '1 hour';
-            """)
-            
-            conn.commit()
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ DELETE: old logs")
-            
-            # ===== 7. Агрегирующие запросы =====
-            cur.execute("""
-                SELECT 
-                    activity_type,
-                    COUNT(*) as cnt,
-                    AVG(value) as avg_val,
-                    MAX(value) as max_val
-                FROM superhero.activity_log
-                WHERE created_at > NOW() - INTERVAL '10 minutes'
-                GROUP BY activity_type;
-            """)
-            
-            results = cur.fetchall()
-            for row in results:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] 📈 {row[0]}: {row[1]} count, avg={row[2]:.2f}")
-            
-            cur.close()
-            conn.close()
-            
-            print(f"✨ Iteration #{iteration} complete\n")
-            
-            # Sleep перед следующим циклом
-            time.sleep(3)
-            
-        except Exception as e:
-            print(f"⚠️  Error: {e}")
-            time.sleep(5)
 
-if __name__ == "__main__":
+        intended = schedule.next()
+        if intended is not None:
+            delay = intended - time.perf_counter()
+            if delay > 0 and stop.wait(delay):
+                break
+
+        if rng.random() < read_ratio:
+            name = rng.choices(read_names, read_weights)[0]
+            _, sql, params = READ_OPS[name]
+        else:
+            name = rng.choices(write_names, write_weights)[0]
+            _, sql, params = WRITE_OPS[name]
+
+        started = time.perf_counter()
+        try:
+            with conn.cursor() as cur, metrics.statement(name, cur):
+                run_operation(cur, name, sql, params(rng, max_hero_id))
+        except psycopg2.Error as e:
+            stats.error(name, e)
+            if conn.closed:
+                pool.putconn(conn, close=True)
+                conn = None
+            continue
+        done = time.perf_counter()
+        response = done - (intended if intended is not None else started)
+        stats.record(name, response, done - started)
+        metrics.observe_iteration(response)
+
+    if conn is not None:
+        pool.putconn(conn)
+
+
+def _ms(value):
+    return f"{value:7.2f}" if value is not None else "      -"
+
+
+def report_interval(stats, schedule, seconds):
+    """Prints one interval line per class; returns the combined interval summary."""
+    response, service, errors = stats.take()
+    everything = combined(response, response)
+    ops = everything.count / seconds if seconds > 0 else 0.0
+    target = f"{schedule.rate:.0f}" if schedule.rate else "max"
+    stamp = datetime.now().strftime('%H:%M:%S')
+    print(f"[{stamp}] {ops:8.1f} ops/s (target {target}), lag {schedule.lag():5.2f}s, "
+          f"errors {sum(errors.values())}")
+    for label, names in (("read", READ_OPS), ("write", WRITE_OPS)):
+        hist = combined(response, names)
+        svc = combined(service, names)
+        print(f"           {label:<5} {hist.count:7d} ops  p50 {_ms(hist.percentile(50))}  p99 {_ms(hist.percentile(99))}  "
+              f"p999 {_ms(hist.percentile(99.9))} ms  (service p99 {_ms(svc.percentile(99))} ms)")
+    for key, n in errors.items():
+        print(f"           ⚠️  {n} x {key}")
+    return everything, sum(errors.values())
+
+
+def run_load_generator(workers=4, rate=20.0, read_ratio=0.8, duration=0.0, report_every=10.0,
+                       ramp=None, step_seconds=30.0, max_p99_ms=None, seed=42):
+    """Runs the workers; with `ramp` (start, stop, step) returns the per-step summaries."""
+    print("🚀 Starting Database Load Generator...")
+    print(f"📊 Target: {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']} "
+          f"({workers} workers, read ratio {read_ratio:.0%})")
+
+    # Отдельное соединение для обслуживания партиций activity_log
+    admin = psycopg2.connect(**DB_CONFIG)
+    activity_log = ActivityLogMaintainer()
+    activity_log.run_if_due(admin)
+    with admin.cursor() as cur:
+        cur.execute("SELECT COALESCE(MAX(id), 1) FROM superhero.superhero")
+        max_hero_id = cur.fetchone()[0]
+    admin.commit()
+
+    rates = list(_ramp_rates(*ramp)) if ramp else [rate]
+    pool = ThreadedConnectionPool(1, workers, **DB_CONFIG)
+    schedule = RateSchedule(rates[0])
+    stats = LoadStats()
+    stop = threading.Event()
+    threads = [threading.Thread(target=worker, args=(pool, schedule, stats, stop, read_ratio, max_hero_id, seed + i),
+                                name=f"load-worker-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    steps = []
+    started = time.perf_counter()
     try:
-        run_load_generator()
+        for step_rate in rates:
+            if ramp:
+                schedule.set_rate(step_rate)
+                stats.take()
+                print(f"\n--- Step: {step_rate:.0f} ops/s for {step_seconds:.0f}s ---")
+            step_started = time.perf_counter()
+            step_hist, step_errors = LatencyHistogram(), 0
+            last = step_started
+            while True:
+                now = time.perf_counter()
+                step_end = step_started + step_seconds if ramp else (started + duration if duration else None)
+                if step_end is not None and now >= step_end:
+                    break
+                wait = report_every if step_end is None else min(report_every, step_end - now)
+                time.sleep(max(0.0, wait))
+                now = time.perf_counter()
+                interval_hist, interval_errors = report_interval(stats, schedule, now - last)
+                step_hist.merge(interval_hist)
+                step_errors += interval_errors
+                last = now
+                activity_log.run_if_due(admin)
+            steps.append(_step_summary(step_rate, step_hist, step_errors, time.perf_counter() - step_started))
+            if ramp and _saturated(steps[-1], max_p99_ms):
+                print(f"\n🛑 Saturated at {step_rate:.0f} ops/s")
+                break
     except KeyboardInterrupt:
         print("\n\n🛑 Stopped by user")
-        exit(0)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        pool.closeall()
+        admin.close()
+
+    if ramp:
+        print_ramp_summary(steps, max_p99_ms)
+    return steps
+
+
+def _ramp_rates(start, stop, step):
+    rate = start
+    while rate <= stop:
+        yield rate
+        rate += step
+
+
+def _step_summary(rate, hist, errors, seconds):
+    summary = hist.summary()
+    summary.update({"target_ops": rate, "achieved_ops": hist.count / seconds if seconds > 0 else 0.0,
+                    "errors": errors, "seconds": seconds})
+    return summary
+
+
+def _saturated(step, max_p99_ms):
+    """The database no longer keeps up: < 95% of the target rate, or p99 over the limit."""
+    if step["target_ops"] and step["achieved_ops"] < 0.95 * step["target_ops"]:
+        return True
+    return max_p99_ms is not None and step["p99_ms"] is not None and step["p99_ms"] > max_p99_ms
+
+
+def print_ramp_summary(steps, max_p99_ms):
+    print("\n--- Ramp Summary ---")
+    print(f"{'target':>8} {'achieved':>9} {'p50 ms':>8} {'p99 ms':>8} {'p999 ms':>8} {'errors':>7}")
+    for step in steps:
+        flag = "  <-- saturated" if _saturated(step, max_p99_ms) else ""
+        print(f"{step['target_ops']:>8.0f} {step['achieved_ops']:>9.1f} {_ms(step['p50_ms']):>8} "
+              f"{_ms(step['p99_ms']):>8} {_ms(step['p999_ms']):>8} {step['errors']:>7}{flag}")
+    healthy = [s for s in steps if not _saturated(s, max_p99_ms)]
+    if healthy:
+        print(f"Highest sustained rate: {healthy[-1]['achieved_ops']:.1f} ops/s")
+
+
+# --- WRITE BENCHMARK ---
+
+def _wal_lsn(cur):
+    cur.execute("SELECT pg_current_wal_lsn()")
+    return cur.fetchone()[0]
+
+
+def write_benchmark(conn, strategy, rows, batch_size, commit_rows):
+    """Inserts `rows` with one strategy in batches, committing once `commit_rows` rows are pending."""
+    insert = WRITE_STRATEGIES[strategy]
+    commits = 0
+    with conn.cursor() as cur:
+        wal_start = _wal_lsn(cur)
+        conn.commit()
+        started = time.perf_counter()
+        pending = 0
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            insert(cur, batch)
+            pending += len(batch)
+            if pending >= commit_rows:
+                conn.commit()
+                commits += 1
+                pending = 0
+        if pending:
+            conn.commit()
+            commits += 1
+        elapsed = time.perf_counter() - started
+        cur.execute("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s)", (wal_start,))
+        wal_bytes = int(cur.fetchone()[0])
+    conn.commit()
+    return {"strategy": strategy, "rows": len(rows), "batch_size": batch_size, "commit_rows": commit_rows,
+            "commits": commits, "seconds": elapsed, "rows_per_s": len(rows) / elapsed if elapsed > 0 else None,
+            "wal_bytes": wal_bytes, "wal_bytes_per_row": wal_bytes / len(rows) if rows else None}
+
+
+def run_write_benchmark(strategies, total_rows=50000, batch_size=1000, commit_rows=10000, seed=42):
+    print("🚀 Starting write benchmark...")
+    print(f"📊 Target: {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']} "
+          f"({total_rows:,} rows per strategy, batch {batch_size:,}, commit every {commit_rows:,} rows)")
+    conn = psycopg2.connect(**DB_CONFIG)
+    results = []
+    try:
+        ActivityLogMaintainer().maintain(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT COALESCE(MAX(id), 1) FROM superhero.superhero")
+            max_hero_id = cur.fetchone()[0]
+        conn.commit()
+
+        for strategy in strategies:
+            # Сгенерировано заранее: измеряется только запись
+            rng = random.Random(seed)
+            rows = [(f"bench_{strategy}", rng.randint(1, max_hero_id), round(rng.uniform(10, 100), 4))
+                    for _ in range(total_rows)]
+            result = write_benchmark(conn, strategy, rows, batch_size, commit_rows)
+            results.append(result)
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {strategy:<15} {result['rows_per_s']:>12,.0f} rows/s  "
+                  f"{result['wal_bytes'] / 1048576:8.1f} MB WAL")
+    finally:
+        conn.close()
+
+    print("\n--- Write Strategies ---")
+    print(f"{'strategy':<15} {'rows/s':>12} {'seconds':>9} {'commits':>8} {'WAL MB':>9} {'WAL B/row':>10}")
+    for r in results:
+        print(f"{r['strategy']:<15} {r['rows_per_s']:>12,.0f} {r['seconds']:>9.2f} {r['commits']:>8} "
+              f"{r['wal_bytes'] / 1048576:>9.1f} {r['wal_bytes_per_row']:>10.0f}")
+    print("(WAL is server-wide: concurrent activity on the server is included)")
+    return results
+
+
+def _parse_strategies(text):
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WRITE_STRATEGIES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(WRITE_STRATEGIES)}")
+    return names
+
+
+def _parse_ramp(text):
+    try:
+        start, stop, step = (float(part) for part in text.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected START:STOP:STEP, e.g. 100:2000:100")
+    if start <= 0 or step <= 0 or stop < start:
+        raise argparse.ArgumentTypeError("need 0 < START <= STOP and STEP > 0")
+    return start, stop, step
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rate-targeted, multi-worker load generator for the superhero database.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("LOAD_WORKERS", "4")))
+    parser.add_argument("--rate", type=float, default=float(os.getenv("LOAD_RATE", "20")),
+                        help="Target operations per second over all workers (0 = as fast as possible)")
+    parser.add_argument("--read-ratio", type=float, default=float(os.getenv("LOAD_READ_RATIO", "0.8")),
+                        help="Share of read operations, 0..1")
+    parser.add_argument("--duration", type=float, default=0, help="Seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--report-interval", type=float, default=float(os.getenv("LOAD_REPORT_INTERVAL", "10")))
+    parser.add_argument("--ramp", type=_parse_ramp, help="START:STOP:STEP ops/s; stops at the first saturated step")
+    parser.add_argument("--step-seconds", type=float, default=30, help="Duration of each ramp step")
+    parser.add_argument("--max-p99-ms", type=float, help="Ramp: a step with a higher p99 counts as saturated")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Write the run summary (one entry per ramp step / strategy) to this JSON file")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="Serve Prometheus client metrics of the mixed load on this port (0 = off)")
+
+    bench = parser.add_argument_group("write benchmark")
+    bench.add_argument("--write-bench", action="store_true", help="Compare insert strategies instead of the mixed load")
+    bench.add_argument("--strategies", type=_parse_strategies, default=list(WRITE_STRATEGIES),
+                       help=f"Comma-separated subset of: {', '.join(WRITE_STRATEGIES)}")
+    bench.add_argument("--bench-rows", type=int, default=50000, help="Rows inserted per strategy")
+    bench.add_argument("--batch-size", type=int, default=1000, help="Rows per statement / COPY (per call for single)")
+    bench.add_argument("--commit-rows", type=int, default=10000, help="Commit once this many rows are pending")
+    args = parser.parse_args(argv)
+    if not 0.0 <= args.read_ratio <= 1.0:
+        parser.error("--read-ratio must be between 0 and 1")
+    if args.batch_size < 1 or args.commit_rows < 1 or args.bench_rows < 1:
+        parser.error("--bench-rows, --batch-size and --commit-rows must be positive")
+
+    if args.write_bench:
+        results = run_write_benchmark(args.strategies, args.bench_rows, args.batch_size, args.commit_rows, args.seed)
+    else:
+        metrics.serve(args.metrics_port)
+        results = run_load_generator(args.workers, args.rate, args.read_ratio, args.duration, args.report_interval,
+                                     args.ramp, args.step_seconds, args.max_p99_ms, args.seed)
+    if args.out and results:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"Saved: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Hero feature matrix for analytics.py
+
+Pulls `hero_attribute` once (one sequential scan) into a NumPy hero x attribute
+matrix together with integer dimension codes for publisher, race and alignment.
+All attribute-based charts and exports are then computed in memory with
+vectorized group-bys instead of re-joining hero_attribute on the server.
+"""
+import numpy as np
+import pandas as pd
+
+# --- SQL: THE ONLY THREE FETCHES THE MATRIX NEEDS ---
+
+# One row per hero with its (already tiny) dimension labels
+query_matrix_heroes = """
+SELECT s.id, s.superhero_name, p.publisher_name, r.race, al.alignment
+FROM "superhero"."superhero" s
+LEFT JOIN "superhero"."publisher" p ON s.publisher_id = p.id
+LEFT JOIN "superhero"."race" r ON s.race_id = r.id
+LEFT JOIN "superhero"."alignment" al ON s.alignment_id = al.id
+ORDER BY s.id;
+"""
+
+query_matrix_attributes = """
+SELECT id, attribute_name
+FROM "superhero"."attribute"
+ORDER BY id;
+"""
+
+# Plain scan, no joins and no aggregation
+query_matrix_hero_attribute = """
+SELECT hero_id, attribute_id, attribute_value
+FROM "superhero"."hero_attribute";
+"""
+
+MATRIX_QUERIES = {
+    "matrix_heroes": (query_matrix_heroes, "Hero Matrix: Heroes and Dimensions"),
+    "matrix_attributes": (query_matrix_attributes, "Hero Matrix: Attribute Names"),
+    "matrix_hero_attribute": (query_matrix_hero_attribute, "Hero Matrix: hero_attribute Scan"),
+}
+
+# --- SQL: THE SAME MATRIX FROM THE MATERIALIZED VIEW (05_materialized_views.sql) ---
+
+# Already pivoted and summed on the server: one indexed row per hero, no hero_attribute scan
+query_matrix_hero_wide = """
+SELECT hero_id, superhero_name, publisher_name, race, alignment,
+       intelligence, strength, speed, durability, power, combat, total_attributes
+FROM "superhero"."mv_hero_attribute_wide"
+ORDER BY hero_id;
+"""
+
+MATRIX_MV_QUERIES = {
+    "matrix_hero_wide": (query_matrix_hero_wide, "Hero Matrix: mv_hero_attribute_wide"),
+    "matrix_attributes": (query_matrix_attributes, "Hero Matrix: Attribute Names"),
+}
+
+
+class HeroMatrix:
+    """Heroes x attributes as a dense float matrix (NaN = no value) plus dimension codes."""
+
+    def __init__(self, df_heroes, df_attributes, df_hero_attribute):
+        """`df_hero_attribute` is a DataFrame or an iterable of DataFrame chunks (e.g. run_query_chunks)."""
+        self.hero_id = df_heroes['id'].to_numpy(dtype=np.int64)
+        self.hero_name = df_heroes['superhero_name'].to_numpy(dtype=object)
+        self.attribute_names = list(df_attributes['attribute_name'])
+
+        # Dimension codes: -1 marks a missing (NULL) label, like pd.factorize
+        self.publisher_codes, self.publisher_labels = pd.factorize(df_heroes['publisher_name'])
+        self.race_codes, self.race_labels = pd.factorize(df_heroes['race'])
+        self.alignment_codes, self.alignment_labels = pd.factorize(df_heroes['alignment'])
+
+        n_heroes = len(self.hero_id)
+        self._hero_index = pd.Index(self.hero_id)
+        self._attribute_index = pd.Index(df_attributes['id'])
+
+        self.values = np.full((n_heroes, len(self.attribute_names)), np.nan)
+        self.totals = np.zeros(n_heroes)
+
+        chunks = [df_hero_attribute] if isinstance(df_hero_attribute, pd.DataFrame) else df_hero_attribute
+        for chunk in chunks:
+            self._add_rows(chunk)
+
+    def _add_rows(self, df_hero_attribute):
+        """Folds a batch of hero_attribute rows into the matrix and per-hero totals."""
+        # Map raw hero_id / attribute_id values to matrix row / column positions (-1 = unknown)
+        rows = self._hero_index.get_indexer(df_hero_attribute['hero_id'])
+        cols = self._attribute_index.get_indexer(df_hero_attribute['attribute_id'])
+        values = pd.to_numeric(df_hero_attribute['attribute_value']).to_numpy(dtype=float)
+        valid = (rows >= 0) & (cols >= 0) & ~np.isnan(values)
+        rows, cols, values = rows[valid], cols[valid], values[valid]
+
+        # MAX(...) semantics per (hero, attribute), same as the CASE-pivot queries
+        np.fmax.at(self.values, (rows, cols), values)
+
+        # SUM over all of a hero's rows, same as SUM(ha.attribute_value)
+        self.totals += np.bincount(rows, weights=values, minlength=len(self.totals))
+
+    @classmethod
+    def from_wide(cls, df_wide, df_attributes):
+        """Builds the matrix from mv_hero_attribute_wide (lower-case column per attribute plus total_attributes)."""
+        matrix = cls(df_wide.rename(columns={'hero_id': 'id'}), df_attributes, [])
+        for col, attribute_name in enumerate(matrix.attribute_names):
+            if attribute_name.lower() in df_wide:
+                matrix.values[:, col] = pd.to_numeric(df_wide[attribute_name.lower()]).to_numpy(dtype=float)
+        matrix.totals = pd.to_numeric(df_wide['total_attributes']).to_numpy(dtype=float)
+        return matrix
+
+    def __len__(self):
+        return len(self.hero_id)
+
+    # --- HELPERS ---
+
+    def column(self, attribute_name):
+        """Returns one attribute column of the matrix (NaN where the hero has no value)."""
+        return self.values[:, self.attribute_names.index(attribute_name)]
+
+    def _publisher_mask(self, publishers):
+        if publishers is None:
+            return self.publisher_codes >= 0
+        wanted = [i for i, label in enumerate(self.publisher_labels) if label in publishers]
+        return np.isin(self.publisher_codes, wanted)
+
+    @staticmethod
+    def _group_mean(codes, weights, n_groups):
+        counts = np.bincount(codes, minlength=n_groups)
+        sums = np.bincount(codes, weights=weights, minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts, counts
+
+    # --- EQUIVALENTS OF THE analytics.py QUERIES ---
+
+    def avg_attribute_by_race(self, attribute_name='Combat', exclude=('-', 'N/A'), min_heroes=5, limit=10):
+        """query_hbar: average of one attribute per race (races with more than `min_heroes` heroes)."""
+        col = self.column(attribute_name)
+        mask = ~np.isnan(col) & (self.race_codes >= 0)
+        excluded = [i for i, label in enumerate(self.race_labels) if label in exclude]
+        mask &= ~np.isin(self.race_codes, excluded)
+
+        means, counts = self._group_mean(self.race_codes[mask], col[mask], len(self.race_labels))
+        keep = counts > min_heroes
+        df = pd.DataFrame({
+            'race': np.asarray(self.race_labels, dtype=object)[keep],
+            f'avg_{attribute_name.lower()}_score': np.round(means[keep], 2),
+        })
+        return df.sort_values(df.columns[1], ascending=False, kind='stable').head(limit).reset_index(drop=True)
+
+    def avg_attributes_by_publisher(self, attribute_names=('Strength', 'Intelligence'), publishers=('Marvel Comics', 'DC Comics')):
+        """query_line: long-format average of each attribute per publisher."""
+        pub_mask = self._publisher_mask(publishers)
+        parts = []
+        for attribute_name in attribute_names:
+            col = self.column(attribute_name)
+            mask = pub_mask & ~np.isnan(col)
+            means, counts = self._group_mean(self.publisher_codes[mask], col[mask], len(self.publisher_labels))
+            present = counts > 0
+            parts.append(pd.DataFrame({
+                'publisher_name': np.asarray(self.publisher_labels, dtype=object)[present],
+                'attribute_name': attribute_name,
+                'avg_attribute_value': means[present],
+            }))
+        df = pd.concat(parts, ignore_index=True)
+        return df.sort_values(['publisher_name', 'attribute_name']).reset_index(drop=True)
+
+    def total_attributes(self):
+        """query_hist: per-hero sum of all attribute values, heroes with a positive total only."""
+        totals = self.totals[self.totals > 0]
+        return pd.DataFrame({'total_attributes': totals.astype(np.int64)})
+
+    def attribute_pivot(self, attribute_names, publishers=('Marvel Comics', 'DC Comics')):
+        """query_scatter: wide per-hero frame of the given attributes, heroes having all of them."""
+        cols = self.values[:, [self.attribute_names.index(name) for name in attribute_names]]
+        mask = self._publisher_mask(publishers) & ~np.isnan(cols).any(axis=1)
+        df = pd.DataFrame({'publisher_name': np.asarray(self.publisher_labels, dtype=object)[self.publisher_codes[mask]]})
+        for i, name in enumerate(attribute_names):
+            df[name.lower()] = cols[mask, i].astype(np.int64)
+        return df
+
+    def top_heroes_by_total(self, limit=100):
+        """query_excel_1: top heroes by total attributes with publisher, race and alignment labels."""
+        df = pd.DataFrame({
+            'superhero_name': self.hero_name,
+            'publisher_name': self._labels(self.publisher_codes, self.publisher_labels),
+            'race': self._labels(self.race_codes, self.race_labels),
+            'alignment': self._labels(self.alignment_codes, self.alignment_labels),
+            'total_attributes': self.totals.astype(np.int64),
+        })
+        keys = ['superhero_name', 'publisher_name', 'race', 'alignment']
+        df = df.groupby(keys, dropna=False, sort=False, as_index=False)['total_attributes'].sum()
+        return df.sort_values('total_attributes', ascending=False, kind='stable').head(limit).reset_index(drop=True)
+
+    def plotly_frame(self, publishers=('Marvel Comics', 'DC Comics')):
+        """query_plotly: id, name, intelligence, strength, publisher and alignment per hero."""
+        intelligence = self.column('Intelligence')
+        strength = self.column('Strength')
+        mask = self._publisher_mask(publishers) & ~np.isnan(intelligence) & ~np.isnan(strength)
+        return pd.DataFrame({
+            'id': self.hero_id[mask],
+            'superhero_name': self.hero_name[mask],
+            'intelligence': intelligence[mask].astype(np.int64),
+            'strength': strength[mask].astype(np.int64),
+            'publisher_name': np.asarray(self.publisher_labels, dtype=object)[self.publisher_codes[mask]],
+            'alignment': self._labels(self.alignment_codes[mask], self.alignment_labels),
+        })
+
+    def total_attributes_by(self, dimension):
+        """Yields (label, DataFrame of total_attributes) for each publisher / race / alignment."""
+        codes = getattr(self, f'{dimension}_codes')
+        labels = getattr(self, f'{dimension}_labels')
+        positive = self.totals > 0
+        for code, label in enumerate(labels):
+            totals = self.totals[positive & (codes == code)]
+            if len(totals):
+                yield label, pd.DataFrame({'total_attributes': totals.astype(np.int64)})
+
+    @staticmethod
+    def _labels(codes, labels):
+        out = np.asarray(labels, dtype=object)[np.maximum(codes, 0)] if len(labels) else np.full(len(codes), None, dtype=object)
+        out[codes < 0] = None
+        return out
+
+
+def load_hero_matrix(fetch):
+    """Builds a HeroMatrix; `fetch(sql, title)` is any run_query-compatible function."""
+    frames = {key: fetch(sql, title) for key, (sql, title) in MATRIX_QUERIES.items()}
+    return HeroMatrix(frames["matrix_heroes"], frames["matrix_attributes"], frames["matrix_hero_attribute"])
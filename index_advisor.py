@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Index advisor
+
+Reads the statistics views of a running database and suggests index changes:
+
+* missing: foreign keys whose columns lead no index (pg_constraint / pg_index),
+  and the filter columns of sequential scans in the most expensive statements
+  (pg_stat_statements, planned with EXPLAIN (GENERIC_PLAN) on PostgreSQL 16+);
+* sequentially scanned tables: large tables read mostly by seq scans (pg_stat_user_tables);
+* unused: indexes not backing a constraint that were never scanned since the
+  last statistics reset (pg_stat_user_indexes). DROP DDL is only printed once
+  the observation window is at least --min-window-hours long; before that the
+  indexes are listed as "too early" (a fresh index has not had a chance to be used).
+
+The statistics describe the workload since the last reset, so let the
+application (or db_load_generator.py) run for a while between --reset and a report.
+
+    python index_advisor.py                  # report with suggested DDL
+    python index_advisor.py --ddl            # only the DDL
+    python index_advisor.py --reset          # start a new observation window
+"""
+import re
+import sys
+import json
+import argparse
+
+# (column, operator) of the comparisons in an EXPLAIN VERBOSE "Filter", e.g.
+# "(hero_attribute.attribute_id = 1)", "((activity_log.activity_type)::text = 'query'::text)".
+# Columns inside a function call ("lower((s.full_name)::text) = ...") are skipped:
+# a plain index on the column would not serve them.
+_COMPARISON = re.compile(
+    r"(?<![\w.(:'])\(*"                                         # opening parentheses, not a function call's or a cast's
+    r"(?:[a-z_][a-z0-9_$]*\.)?([a-z_][a-z0-9_$]*)"              # [relation.]column
+    r"\)*(?:::[a-z ]+(?:\(\d+(?:,\d+)?\))?(?:\[\])?\)*)*"       # casts: ")::text", ")::character varying(20))"
+    r"\s*(=|<>|<=|>=|<|>|~~\*?|IS NOT NULL|IS NULL)", re.IGNORECASE)
+_EQUALITY = {"=", "IS NULL"}
+
+
+def fetch(conn, sql, params=None):
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        columns = [c[0] for c in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+# --- CATALOG / STATISTICS ---
+
+def unindexed_foreign_keys(conn, schema):
+    """Foreign keys whose columns are not the leading columns of any index on the referencing table."""
+    return fetch(conn, """
+        SELECT c.conrelid::regclass::text AS table_name, c.conname,
+               array_agg(a.attname::text ORDER BY k.ord) AS columns,
+               pg_relation_size(c.conrelid) AS table_bytes,
+               (SELECT n_live_tup FROM pg_stat_user_tables WHERE relid = c.conrelid) AS n_live_tup
+        FROM pg_constraint c
+        CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+        WHERE c.contype = 'f' AND c.connamespace = %s::regnamespace
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_index i
+              WHERE i.indrelid = c.conrelid
+                AND (i.indkey::int2[])[0:cardinality(c.conkey) - 1] @> c.conkey
+          )
+        GROUP BY c.conrelid, c.conname
+        ORDER BY table_bytes DESC, c.conname
+    """, (schema,))
+
+
+def sequential_scan_tables(conn, schema, min_rows):
+    """Tables of at least `min_rows` rows read more often by seq scans than by index scans."""
+    return fetch(conn, """
+        SELECT format('%%I.%%I', schemaname, relname) AS table_name, n_live_tup,
+               seq_scan, seq_tup_read, COALESCE(idx_scan, 0) AS idx_scan,
+               seq_tup_read / NULLIF(seq_scan, 0) AS rows_per_seq_scan
+        FROM pg_stat_user_tables
+        WHERE schemaname = %s AND n_live_tup >= %s AND seq_scan > COALESCE(idx_scan, 0)
+        ORDER BY seq_tup_read DESC
+    """, (schema, min_rows))
+
+
+def unused_indexes(conn, schema):
+    """Never-scanned indexes that do not back a constraint and are not partitions of a partitioned index."""
+    return fetch(conn, """
+        SELECT format('%%I.%%I', s.schemaname, s.indexrelname) AS index_name,
+               format('%%I.%%I', s.schemaname, s.relname) AS table_name,
+               pg_relation_size(s.indexrelid) AS index_bytes,
+               pg_get_indexdef(s.indexrelid) AS definition
+        FROM pg_stat_user_indexes s
+        JOIN pg_index i ON i.indexrelid = s.indexrelid
+        WHERE s.schemaname = %s AND s.idx_scan = 0
+          AND NOT i.indisunique AND NOT i.indisprimary
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = s.indexrelid)
+          -- partition indexes belong to the parent's partitioned index and cannot be dropped alone
+          AND NOT EXISTS (SELECT 1 FROM pg_inherits h WHERE h.inhrelid = s.indexrelid)
+        ORDER BY index_bytes DESC
+    """, (schema,))
+
+
+def index_leading_columns(conn, schema):
+    """{table: [[col, ...] per index]} for every index in `schema` (key columns only)."""
+    indexes = {}
+    for row in fetch(conn, """
+        SELECT format('%%I.%%I', n.nspname, t.relname) AS table_name,
+               array(SELECT a.attname::text FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+                     JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                     WHERE k.ord <= i.indnkeyatts ORDER BY k.ord) AS columns
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = %s
+    """, (schema,)):
+        indexes.setdefault(row["table_name"], []).append(row["columns"])
+    return indexes
+
+
+def stats_window(conn):
+    """(start, seconds) of the statistics window: the last reset, else the server start (a lower bound)."""
+    row = fetch(conn, """
+        SELECT COALESCE(stats_reset, pg_postmaster_start_time()) AS start,
+               stats_reset IS NULL AS since_start,
+               EXTRACT(EPOCH FROM now() - COALESCE(stats_reset, pg_postmaster_start_time()))::float AS seconds
+        FROM pg_stat_database WHERE datname = current_database()
+    """)[0]
+    return (f"{row['start']} (server start)" if row["since_start"] else row["start"]), row["seconds"]
+
+
+# --- STATEMENTS ---
+
+def top_statements(conn, limit):
+    """Most expensive statements by total time, or None (with the reason) without pg_stat_statements."""
+    if not fetch(conn, "SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"):
+        return None, "extension pg_stat_statements is not installed (see 06_hero_keys_indexes.sql)"
+    try:
+        rows = fetch(conn, """
+            SELECT queryid, calls, total_exec_time, mean_exec_time, rows, query
+            FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+              AND query ~* '^\\s*(select|with|update|delete)\\s'
+            ORDER BY total_exec_time DESC
+            LIMIT %s
+        """, (limit,))
+    except Exception as e:
+        conn.rollback()
+        return None, str(e).strip().splitlines()[0]
+    return rows, None
+
+
+def seq_scan_filters(conn, sql, generic_plans):
+    """[(table, [filter columns])] of the sequential scans in the plan of a normalized statement."""
+    options = "VERBOSE, FORMAT JSON"
+    if re.search(r"\$\d", sql):
+        if not generic_plans:
+            return []
+        options += ", GENERIC_PLAN"
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN ({options}) {sql}")
+            plan = cur.fetchone()[0]
+    except Exception:
+        return []
+    finally:
+        conn.rollback()
+    plan = plan[0] if isinstance(plan, list) else json.loads(plan)[0]
+
+    scans = []
+    stack = [plan["Plan"]]
+    while stack:
+        node = stack.pop()
+        stack.extend(node.get("Plans", ()))
+        if node["Node Type"] == "Seq Scan" and node.get("Filter"):
+            table = f'{node["Schema"]}.{node["Relation Name"]}'
+            scans.append((table, _COMPARISON.findall(node["Filter"])))
+    return scans
+
+
+def suggest_from_statements(conn, schema, statements, min_rows):
+    """{(table, columns): [queryid, ...]} index candidates: equality columns first, then one range column."""
+    generic_plans = int(fetch(conn, "SHOW server_version_num")[0]["server_version_num"]) >= 160000
+    table_columns = {}
+    for row in fetch(conn, """
+        SELECT format('%%I.%%I', c.table_schema, c.table_name) AS table_name, array_agg(c.column_name::text) AS columns
+        FROM information_schema.columns c
+        JOIN pg_stat_user_tables t ON t.schemaname = c.table_schema AND t.relname = c.table_name
+        WHERE c.table_schema = %s AND t.n_live_tup >= %s
+        GROUP BY 1
+    """, (schema, min_rows)):
+        table_columns[row["table_name"]] = set(row["columns"])
+    existing = index_leading_columns(conn, schema)
+
+    candidates = {}
+    for statement in statements:
+        for table, comparisons in seq_scan_filters(conn, statement["query"], generic_plans):
+            if table not in table_columns:
+                continue
+            equality, ranges = [], []
+            for column, operator in comparisons:
+                if column not in table_columns[table]:
+                    continue
+                target = equality if operator.upper() in _EQUALITY else ranges
+                if column not in equality and column not in target:
+                    target.append(column)
+            columns = tuple(equality + ranges[:1])
+            if not columns or any(list(columns) == index[:len(columns)] for index in existing.get(table, [])):
+                continue
+            candidates.setdefault((table, columns), []).append(statement["queryid"])
+    return candidates
+
+
+# --- REPORT ---
+
+def _size(n):
+    for unit in ("B", "kB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0
+
+
+def advise(conn, schema="superhero", min_rows=10000, top=20, min_window_hours=24.0):
+    """Collects every finding; returns (report lines, DDL statements)."""
+    lines, ddl = [], []
+
+    window_start, window_seconds = stats_window(conn)
+    lines.append(f"Statistics since: {window_start} ({window_seconds / 3600:.1f} h)")
+
+    lines.append("\n--- Unindexed Foreign Keys ---")
+    for fk in unindexed_foreign_keys(conn, schema):
+        small = (fk["n_live_tup"] or 0) < min_rows
+        lines.append(f"{fk['table_name']:<32} {fk['conname']:<20} ({', '.join(fk['columns'])})  {_size(fk['table_bytes'])}"
+                     + ("  (small table, no DDL)" if small else ""))
+        if not small:
+            ddl.append(f"CREATE INDEX CONCURRENTLY ON {fk['table_name']} ({', '.join(fk['columns'])});")
+
+    lines.append(f"\n--- Tables Read Mostly By Sequential Scans (>= {min_rows:,} rows) ---")
+    for table in sequential_scan_tables(conn, schema, min_rows):
+        lines.append(f"{table['table_name']:<32} {table['n_live_tup']:>12,} rows  seq_scan={table['seq_scan']:,} "
+                     f"idx_scan={table['idx_scan']:,}  ~{table['rows_per_seq_scan'] or 0:,} rows read per seq scan")
+
+    lines.append(f"\n--- Sequential Scan Filters In The Top {top} Statements ---")
+    statements, reason = top_statements(conn, top)
+    if statements is None:
+        lines.append(f"skipped: {reason}")
+    else:
+        by_id = {s["queryid"]: s for s in statements}
+        for (table, columns), queryids in suggest_from_statements(conn, schema, statements, min_rows).items():
+            total_ms = sum(by_id[q]["total_exec_time"] for q in queryids)
+            lines.append(f"{table:<32} ({', '.join(columns)})  {len(queryids)} statement(s), {total_ms:,.0f} ms total")
+            for queryid in queryids:
+                lines.append(f"    {' '.join(by_id[queryid]['query'].split())[:100]}")
+            ddl.append(f"CREATE INDEX CONCURRENTLY ON {table} ({', '.join(columns)});")
+
+    lines.append("\n--- Unused Indexes ---")
+    too_early = window_seconds < min_window_hours * 3600
+    if too_early:
+        lines.append(f"too early: the statistics cover {window_seconds / 3600:.1f} h < {min_window_hours:g} h "
+                     "(--min-window-hours), no DROP DDL")
+    for index in unused_indexes(conn, schema):
+        lines.append(f"{index['index_name']:<40} {_size(index['index_bytes']):>10}  {index['definition']}")
+        if not too_early:
+            ddl.append(f"DROP INDEX CONCURRENTLY {index['index_name']};")
+    if not too_early:
+        lines.append("(an index created after the statistics window started may not have been needed yet)")
+
+    conn.rollback()
+    return lines, ddl
+
+
+def reset_statistics(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_stat_reset()")
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+        if cur.fetchone():
+            cur.execute("SELECT pg_stat_statements_reset()")
+    conn.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suggest missing and unused indexes from the PostgreSQL statistics views.")
+    parser.add_argument("--schema", default="superhero")
+    parser.add_argument("--min-rows", type=int, default=10000, help="Ignore tables smaller than this")
+    parser.add_argument("--top", type=int, default=20, help="Statements from pg_stat_statements to examine")
+    parser.add_argument("--min-window-hours", type=float, default=24,
+                        help="Statistics window needed before unused indexes get DROP DDL")
+    parser.add_argument("--ddl", action="store_true", help="Print only the suggested DDL")
+    parser.add_argument("--reset", action="store_true", help="Reset the statistics (starts a new observation window)")
+    args = parser.parse_args(argv)
+
+    from analytics import get_engine
+    conn = get_engine().raw_connection()
+    try:
+        if args.reset:
+            reset_statistics(conn)
+            print("Statistics reset.")
+            return 0
+        lines, ddl = advise(conn, args.schema, args.min_rows, args.top, args.min_window_hours)
+    finally:
+        conn.close()
+
+    if not args.ddl:
+        print("\n".join(lines))
+        print("\n--- Suggested DDL ---")
+    print("\n".join(ddl) if ddl else "-- nothing to suggest")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+HDR-style latency histogram
+
+Values are stored in microseconds in log-linear buckets: exact below 64 us,
+then every power-of-two range is split into SUB_BUCKETS linear buckets. The
+relative error is therefore bounded (< 1/SUB_BUCKETS, ~3%) from microseconds
+to hours with a few hundred buckets, and histograms of different threads or
+intervals merge by adding counts.
+"""
+import math
+import threading
+
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS
+
+
+def _index(us):
+    us = max(int(us), 0)
+    exp = us.bit_length() - 1
+    if exp <= SUB_BITS:
+        return us
+    return (exp - SUB_BITS + 1) * SUB_BUCKETS + (us >> (exp - SUB_BITS)) - SUB_BUCKETS
+
+
+def _bounds(index):
+    """(lowest, highest) microseconds that land in bucket `index`."""
+    if index < 2 * SUB_BUCKETS:
+        return index, index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = SUB_BUCKETS + index % SUB_BUCKETS
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Thread-safe latency recorder; record() takes seconds, the statistics are in milliseconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def record(self, seconds):
+        us = int(seconds * 1e6)
+        index = _index(us)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total_us += us
+            self.min_us = us if self.min_us is None else min(self.min_us, us)
+            self.max_us = max(self.max_us, us)
+
+    def merge(self, other):
+        with self._lock:
+            for index, n in other.counts.items():
+                self.counts[index] = self.counts.get(index, 0) + n
+            self.count += other.count
+            self.total_us += other.total_us
+            if other.min_us is not None:
+                self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+            self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def take(self):
+        """Returns a copy with everything recorded so far and resets this one (interval reporting)."""
+        copy = LatencyHistogram()
+        with self._lock:
+            copy.counts, copy.count, copy.total_us = self.counts, self.count, self.total_us
+            copy.min_us, copy.max_us = self.min_us, self.max_us
+            self._reset()
+        return copy
+
+    def percentile(self, p):
+        """Latency in ms below which `p` percent of the values fall (highest equivalent value of the bucket)."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bounds(index)[1], self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def mean(self):
+        return self.total_us / self.count / 1000.0 if self.count else None
+
+    def summary(self, percentiles=(50, 99, 99.9)):
+        """{"count", "mean_ms", "p50_ms", ..., "max_ms"} (p99.9 -> "p999_ms")."""
+        result = {"count": self.count, "mean_ms": self.mean()}
+        for p in percentiles:
+            result[f"p{str(p).replace('.', '')}_ms"] = self.percentile(p)
+        result["max_ms"] = self.max_us / 1000.0 if self.count else None
+        return result
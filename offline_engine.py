@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Offline columnar engine over a Parquet snapshot of the superhero schema
+
+`snapshot` dumps every table, view and materialized view of the schema to one
+Parquet file each (streamed through a server-side cursor, with Arrow types
+derived from the Postgres column types). OfflineEngine then runs the same SQL
+in-process with DuckDB over those files, so analytics.py and pythonTest.py
+work without a database: set SNAPSHOT_DIR and they read the snapshot instead.
+
+DuckDB is configured to behave like Postgres where the queries depend on it:
+NULLs sort last ascending / first descending, integer division truncates and
+unquoted result column names are folded to lower case. `verify` runs every
+catalogued query on both engines and reports any result that differs.
+
+    python offline_engine.py snapshot --dir snapshot
+    python offline_engine.py verify --dir snapshot
+    SNAPSHOT_DIR=snapshot python analytics.py excel
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "snapshot.json"
+
+RELATIONS_SQL = """
+SELECT c.relname, c.relkind
+FROM pg_class c
+WHERE c.relnamespace = %(schema)s::regnamespace
+  AND c.relkind IN ('r', 'p', 'v', 'm')
+  AND NOT c.relispartition
+ORDER BY c.relname
+"""
+
+COLUMNS_SQL = """
+SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+FROM pg_attribute a
+WHERE a.attrelid = %(relation)s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+ORDER BY a.attnum
+"""
+
+RELATION_KINDS = {"r": "table", "p": "table", "v": "view", "m": "materialized view"}
+
+
+def arrow_type(pg_type):
+    """Arrow type for a format_type() string; unconstrained numeric becomes float64."""
+    import pyarrow as pa
+
+    simple = {
+        "smallint": pa.int16(), "integer": pa.int32(), "bigint": pa.int64(),
+        "real": pa.float32(), "double precision": pa.float64(), "numeric": pa.float64(),
+        "boolean": pa.bool_(), "date": pa.date32(), "text": pa.string(),
+        "timestamp without time zone": pa.timestamp("us"),
+        "timestamp with time zone": pa.timestamp("us", tz="UTC"),
+    }
+    if pg_type in simple:
+        return simple[pg_type]
+    match = re.fullmatch(r"numeric\((\d+),(\d+)\)", pg_type)
+    if match:
+        return pa.decimal128(int(match.group(1)), int(match.group(2)))
+    # character varying(n), character(n), json, uuid, ... as text
+    return pa.string()
+
+
+def _column(values, typ):
+    import pyarrow as pa
+    if pa.types.is_floating(typ):
+        values = [None if v is None else float(v) for v in values]
+    elif pa.types.is_string(typ):
+        values = [None if v is None else str(v) for v in values]
+    return pa.array(values, type=typ)
+
+
+def snapshot_schema(conn, directory, schema="superhero", chunksize=50000):
+    """Writes <directory>/<relation>.parquet for every relation of `schema` plus a manifest."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "schema": schema,
+        "relations": {},
+    }
+    with conn.cursor() as cur:
+        cur.execute(RELATIONS_SQL, {"schema": schema})
+        relations = cur.fetchall()
+
+    for name, kind in relations:
+        started = time.perf_counter()
+        qualified = f'"{schema}"."{name}"'
+        with conn.cursor() as cur:
+            cur.execute(COLUMNS_SQL, {"relation": qualified})
+            columns = cur.fetchall()
+        arrow_schema = pa.schema([(col, arrow_type(pg_type)) for col, pg_type in columns])
+
+        path = os.path.join(directory, f"{name}.parquet")
+        rows = 0
+        with pq.ParquetWriter(path + ".tmp", arrow_schema) as writer, conn.cursor(name=f"snapshot_{name}") as cur:
+            cur.itersize = chunksize
+            cur.execute(f"SELECT * FROM {qualified}")
+            while True:
+                batch = cur.fetchmany(chunksize)
+                if not batch:
+                    break
+                values = list(zip(*batch))
+                writer.write_table(pa.table([_column(values[i], field.type) for i, field in enumerate(arrow_schema)],
+                                            schema=arrow_schema))
+                rows += len(batch)
+        conn.rollback()
+        os.replace(path + ".tmp", path)
+
+        manifest["relations"][name] = {"kind": RELATION_KINDS[kind], "rows": rows, "file": f"{name}.parquet",
+                                       "columns": [[col, pg_type] for col, pg_type in columns]}
+        print(f"{RELATION_KINDS[kind]:<18} {name:<34} {rows:>10} rows  {time.perf_counter() - started:6.2f}s")
+
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+class OfflineEngine:
+    """Runs Postgres-dialect SELECTs in-process with DuckDB over a snapshot directory."""
+
+    # Postgres behaviour the catalogued queries rely on
+    SESSION_SETTINGS = (
+        "SET default_null_order = 'nulls_last_on_asc_first_on_desc'",
+        "SET integer_division = true",
+    )
+
+    def __init__(self, directory):
+        import duckdb
+
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"{directory}: unsupported snapshot version {self.manifest.get('version')!r}")
+
+        self.directory = directory
+        self.schema = self.manifest["schema"]
+        self._db = duckdb.connect(":memory:")
+        self._db.execute(f'CREATE SCHEMA "{self.schema}"')
+        for name, relation in self.manifest["relations"].items():
+            path = os.path.abspath(os.path.join(directory, relation["file"])).replace("'", "''")
+            self._db.execute(f"""CREATE VIEW "{self.schema}"."{name}" AS SELECT * FROM read_parquet('{path}')""")
+
+    def _cursor(self):
+        # One DuckDB connection per call: safe to use from run_queries_concurrently's threads
+        cur = self._db.cursor()
+        for statement in self.SESSION_SETTINGS:
+            cur.execute(statement)
+        cur.execute(f"SET search_path = '{self.schema},main'")
+        return cur
+
+    @staticmethod
+    def _fold_names(df, sql):
+        """Lower-cases result column names like Postgres, except names written "quoted" in `sql`."""
+        quoted = set(re.findall(r'"([^"]+)"', sql))
+        df.columns = [name if name in quoted else name.lower() for name in df.columns]
+        return df
+
+    def query(self, sql):
+        """Returns the result of `sql` as a DataFrame."""
+        cur = self._cursor()
+        try:
+            return self._fold_names(cur.execute(sql).df(), sql)
+        finally:
+            cur.close()
+
+    def query_chunks(self, sql, chunksize):
+        """Yields the result of `sql` as DataFrames of at most `chunksize` rows (one empty frame if none)."""
+        cur = self._cursor()
+        try:
+            reader = cur.execute(sql).fetch_record_batch(chunksize)
+            empty = True
+            for batch in reader:
+                if batch.num_rows:
+                    empty = False
+                    yield self._fold_names(batch.to_pandas(), sql)
+            if empty:
+                yield self._fold_names(reader.schema.empty_table().to_pandas(), sql)
+        finally:
+            cur.close()
+
+
+# --- VERIFY ---
+
+def _normalized(df, ordered):
+    """Comparable form of a result: lower-case names, floats rounded, optionally sorted."""
+    import decimal
+    import pandas as pd
+
+    df = df.copy()
+    df.columns = [str(name).lower() for name in df.columns]
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == object and values.map(lambda v: isinstance(v, decimal.Decimal)).any():
+            values = values.map(lambda v: None if v is None else float(v))
+        if pd.api.types.is_numeric_dtype(values) or values.dtype == object:
+            numeric = pd.to_numeric(values, errors="coerce")
+            if numeric.notna().sum() == values.notna().sum():
+                values = numeric.astype(float).round(6)
+        df[col] = values.astype(object).where(values.notna(), None)
+    if not ordered:
+        df = df.sort_values(list(df.columns), na_position="first", key=lambda s: s.astype(str))
+    return df.reset_index(drop=True)
+
+
+def _top_level(sql, pattern):
+    """Start offsets of the matches of `pattern` outside parentheses."""
+    depth, level = 0, []
+    for ch in sql:
+        level.append(depth)
+        depth += {"(": 1, ")": -1}.get(ch, 0)
+    return [m for m in re.finditer(pattern, sql, re.IGNORECASE) if level[m.start()] == 0]
+
+
+def order_keys(sql, columns):
+    """Result columns of the outermost ORDER BY, or None if a key is not an output column (or there is none)."""
+    sql = sql.strip().rstrip(";")
+    clauses = _top_level(sql, r"\border\s+by\b")
+    if not clauses:
+        return None
+    clause = sql[clauses[-1].end():]
+    stop = _top_level(clause, r"\b(limit|offset|fetch)\b")
+    if stop:
+        clause = clause[:stop[0].start()]
+    bounds = [0] + [m.start() + 1 for m in _top_level(clause, ",")] + [len(clause) + 1]
+    keys = []
+    for item in [clause[a:b - 1] for a, b in zip(bounds, bounds[1:])]:
+        expr = re.sub(r"\s+(asc|desc)?\s*(nulls\s+(first|last))?\s*$", "", item.strip(), flags=re.IGNORECASE).strip().lower()
+        alias = re.search(re.escape(expr) + r"\s+as\s+(\w+)", sql, re.IGNORECASE)
+        if expr.isdigit() and 0 < int(expr) <= len(columns):
+            keys.append(columns[int(expr) - 1])
+        elif expr in columns or expr.split(".")[-1] in columns:
+            keys.append(expr.split(".")[-1])
+        elif alias and alias.group(1).lower() in columns:
+            keys.append(alias.group(1).lower())
+        else:
+            return None
+    return keys
+
+
+def _compare_ordered(pg, offline, keys, limited):
+    """Status of two ordered, normalized results that differ: same sort-key sequence, rows differing only among equal keys."""
+    pg_keys = list(pg[keys].itertuples(index=False, name=None))
+    if pg_keys != list(offline[keys].itertuples(index=False, name=None)):
+        return "rows differ (order of the ORDER BY keys)"
+    rows_pg = list(pg.itertuples(index=False, name=None))
+    rows_offline = list(offline.itertuples(index=False, name=None))
+    tie_cut = False
+    start = 0
+    while start < len(pg_keys):
+        end = start
+        while end < len(pg_keys) and pg_keys[end] == pg_keys[start]:
+            end += 1
+        if sorted(rows_pg[start:end], key=str) != sorted(rows_offline[start:end], key=str):
+            # Only the last group of equal keys may be cut differently by LIMIT
+            if not (limited and end == len(pg_keys)):
+                return "rows differ"
+            tie_cut = True
+        start = end
+    return "ok (LIMIT tie)" if tie_cut else "ok (tie order)"
+
+
+def compare_results(df_pg, df_offline, sql):
+    """'ok', 'ok (tie order)', 'ok (LIMIT tie)' or a short mismatch description.
+
+    For ordered queries the sort keys of the outermost ORDER BY must come out in the
+    same sequence; rows may only be permuted (or, under LIMIT, swapped in the last
+    group) among rows with equal keys.
+    """
+    normalized_sql = " ".join(sql.lower().split())
+    ordered = "order by" in normalized_sql
+    if list(df_pg.columns.str.lower()) != list(df_offline.columns):
+        return f"columns differ: {list(df_pg.columns)} vs {list(df_offline.columns)}"
+    if len(df_pg) != len(df_offline):
+        return f"row count differs: {len(df_pg)} vs {len(df_offline)}"
+    pg, offline = _normalized(df_pg, ordered), _normalized(df_offline, ordered)
+    if pg.equals(offline):
+        return "ok"
+    if not ordered:
+        return "rows differ"
+    keys = order_keys(sql, list(pg.columns))
+    if keys is None:
+        return "rows differ (ORDER BY keys not in the output, ties cannot be checked)"
+    return _compare_ordered(pg, offline, keys, _top_level(sql, r"\blimit\b") != [])
+
+
+def verify(pg_conn, offline, queries):
+    """Runs every query on Postgres (psycopg2 connection) and offline; returns {name: status}."""
+    import pandas as pd
+
+    statuses = {}
+    for name, (sql, _) in queries.items():
+        try:
+            with pg_conn.cursor() as cur:
+                # Same resolution of unqualified names (queries.sql) as the offline engine
+                cur.execute("SET search_path TO superhero, public")
+                cur.execute(sql)
+                df_pg = pd.DataFrame.from_records(cur.fetchall(), columns=[desc[0] for desc in cur.description])
+        except Exception as e:
+            statuses[name] = f"skipped (Postgres: {str(e).strip().splitlines()[0]})"
+            continue
+        finally:
+            pg_conn.rollback()
+        try:
+            df_offline = offline.query(sql)
+        except Exception as e:
+            statuses[name] = f"offline error: {str(e).strip().splitlines()[0]}"
+            continue
+        statuses[name] = compare_results(df_pg, df_offline, sql)
+    return statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parquet snapshot of the superhero schema and an offline DuckDB engine over it.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("snapshot", "Dump every relation of the schema to Parquet"),
+                               ("verify", "Check that every catalogued query gives the same result offline")):
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument("--dir", default=os.environ.get("SNAPSHOT_DIR") or "snapshot")
+    query_parser = subparsers.add_parser("query", help="Run one SQL statement against the snapshot")
+    query_parser.add_argument("sql")
+    query_parser.add_argument("--dir", default=os.environ.get("SNAPSHOT_DIR") or "snapshot")
+    args = parser.parse_args(argv)
+
+    if args.command == "query":
+        print(OfflineEngine(args.dir).query(args.sql).to_string(index=False))
+        return 0
+
+    # Both of these read the live database, whatever SNAPSHOT_DIR says
+    os.environ.pop("SNAPSHOT_DIR", None)
+    from analytics import get_engine
+
+    if args.command == "snapshot":
+        conn = get_engine().raw_connection()
+        try:
+            manifest = snapshot_schema(conn, args.dir)
+        finally:
+            conn.close()
+        print(f"Snapshot of {len(manifest['relations'])} relations written to {args.dir}/")
+        return 0
+
+    from plan_capture import catalogue
+    conn = get_engine().raw_connection()
+    try:
+        statuses = verify(conn, OfflineEngine(args.dir), catalogue())
+    finally:
+        conn.close()
+    print(f"\n--- Offline Engine Verification ({args.dir}) ---")
+    for name, status in statuses.items():
+        print(f"{name:<55} {status}")
+    failed = [name for name, status in statuses.items() if not status.startswith(("ok", "skipped"))]
+    print(f"{len(statuses) - len(failed)}/{len(statuses)} queries match.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Query plan capture and regression report
+
+Runs EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) on every catalogued query (the
+query_* SQL of analytics.py and hero_matrix.py, pythonTest.QUERIES and the
+statements of queries.sql), each inside a transaction that is rolled back, and
+stores plans, timings and buffer counts as one versioned JSON file per run.
+A run can be diffed against a baseline run; regressions in execution time,
+shared buffers touched or plan shape are flagged and make the exit code 1.
+
+    python plan_capture.py capture                       # -> plan_history/<timestamp>.json
+    python plan_capture.py capture --baseline plan_history/base.json
+    python plan_capture.py diff plan_history/base.json plan_history/new.json
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import statistics
+from itertools import zip_longest
+from datetime import datetime, timezone
+
+PLAN_FORMAT_VERSION = 1
+PLAN_DIR = os.environ.get("PLAN_DIR", "plan_history")
+QUERIES_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "queries.sql")
+
+# "-- -- 6. Show top 20 superheroes ..." -> heading of the next statement
+_HEADING = re.compile(r'^(?:--\s*)+(\d+)\.\s*(.+?)\s*$')
+
+
+# --- QUERY CATALOGUE ---
+
+def load_sql_file(path=QUERIES_SQL):
+    """Statements of a .sql file whose queries are commented out (as queries.sql keeps them).
+
+    Returns {name: (sql, heading)}; names are positional ("queries.sql:07").
+    """
+    statements = {}
+    heading, lines = None, []
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.rstrip()
+            match = _HEADING.match(line)
+            if match:
+                heading = match.group(2)
+                continue
+            line = re.sub(r'^--\s?', '', line)
+            if not line.strip() and not lines:
+                continue
+            lines.append(line)
+            if line.rstrip().endswith(';'):
+                name = f"{os.path.basename(path)}:{len(statements) + 1:02d}"
+                statements[name] = ("\n".join(lines).strip(), heading)
+                heading, lines = None, []
+    return statements
+
+
+def catalogue(sources=("analytics", "pythonTest", "queries.sql")):
+    """All named queries as {name: (sql, description)}."""
+    queries = {}
+    if "analytics" in sources:
+        import analytics
+        import hero_matrix
+        for module in (analytics, hero_matrix):
+            for attr, value in vars(module).items():
+                if attr.startswith("query_") and isinstance(value, str):
+                    queries[f"{module.__name__}.{attr}"] = (value, None)
+    if "pythonTest" in sources:
+        import pythonTest
+        for key, sql in pythonTest.QUERIES.items():
+            queries[f"pythonTest.{key}"] = (sql, None)
+    if "queries.sql" in sources:
+        queries.update(load_sql_file())
+    return queries
+
+
+# --- CAPTURE ---
+
+def plan_shape(node, depth=0):
+    """Depth-first list of node signatures, e.g. '  Hash Join (Inner)' / 'Seq Scan on hero_power'."""
+    signature = node["Node Type"]
+    if node.get("Join Type"):
+        signature += f" ({node['Join Type']})"
+    if node.get("Strategy"):
+        signature += f" [{node['Strategy']}]"
+    if node.get("Relation Name"):
+        signature += f" on {node['Relation Name']}"
+    if node.get("Index Name"):
+        signature += f" using {node['Index Name']}"
+    shape = ["  " * depth + signature]
+    for child in node.get("Plans", ()):
+        shape.extend(plan_shape(child, depth + 1))
+    return shape
+
+
+def explain(conn, sql, repeat=1):
+    """EXPLAIN ANALYZE `sql` `repeat` times (rolled back each time); keeps the median timings."""
+    runs = []
+    for _ in range(repeat):
+        with conn.cursor() as cur:
+            try:
+                cur.execute("SET LOCAL search_path TO superhero, public")
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql.strip().rstrip(";"))
+                result = cur.fetchone()[0]
+            finally:
+                conn.rollback()
+        runs.append(result[0] if isinstance(result, list) else json.loads(result)[0])
+
+    plan = runs[-1]
+    root = plan["Plan"]
+    return {
+        "planning_ms": statistics.median(run["Planning Time"] for run in runs),
+        "execution_ms": statistics.median(run["Execution Time"] for run in runs),
+        "rows": root.get("Actual Rows"),
+        "shared_hit_blocks": root.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": root.get("Shared Read Blocks", 0),
+        "temp_blocks": root.get("Temp Read Blocks", 0) + root.get("Temp Written Blocks", 0),
+        "shape": plan_shape(root),
+        "plan": plan,
+    }
+
+
+def capture(conn, queries, repeat=3):
+    """Captures every query; a failing query is recorded with its error instead of aborting the run."""
+    with conn.cursor() as cur:
+        cur.execute("SHOW server_version")
+        server_version = cur.fetchone()[0]
+    conn.rollback()
+
+    results = {}
+    for name, (sql, description) in queries.items():
+        entry = {"sql_sha256": hashlib.sha256(sql.encode("utf-8")).hexdigest(), "sql": sql}
+        if description:
+            entry["description"] = description
+        try:
+            entry.update(explain(conn, sql, repeat))
+            print(f"{name:<55} {entry['execution_ms']:10.3f} ms  {entry['shared_hit_blocks'] + entry['shared_read_blocks']:8d} buffers")
+        except Exception as e:
+            entry["error"] = str(e).strip().splitlines()[0]
+            print(f"{name:<55} ERROR: {entry['error']}", file=sys.stderr)
+        results[name] = entry
+
+    return {
+        "version": PLAN_FORMAT_VERSION,
+        "captured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "server_version": server_version,
+        "repeat": repeat,
+        "queries": results,
+    }
+
+
+def save_run(run, path=None):
+    if path is None:
+        os.makedirs(PLAN_DIR, exist_ok=True)
+        stamp = run["captured_at"].replace(":", "").replace("-", "").replace("+0000", "Z")
+        path = os.path.join(PLAN_DIR, f"{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=1, sort_keys=True)
+    return path
+
+
+def load_run(path):
+    with open(path, encoding="utf-8") as f:
+        run = json.load(f)
+    if run.get("version") != PLAN_FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported plan file version {run.get('version')!r}")
+    return run
+
+
+# --- DIFF ---
+
+def diff_runs(baseline, current, time_ratio=1.5, min_time_ms=1.0, buffer_ratio=1.5, min_buffers=100):
+    """Returns a list of (query, kind, detail) regressions of `current` against `baseline`.
+
+    Time and buffer regressions need both the ratio and the absolute minimum to be
+    exceeded, so sub-millisecond jitter on tiny queries is not reported.
+    """
+    regressions = []
+    for name, new in current["queries"].items():
+        old = baseline["queries"].get(name)
+        if old is None or "error" in old:
+            continue
+        if "error" in new:
+            regressions.append((name, "error", new["error"]))
+            continue
+        if old["sql_sha256"] != new["sql_sha256"]:
+            regressions.append((name, "sql", "query text changed; compare manually"))
+            continue
+
+        old_ms, new_ms = old["execution_ms"], new["execution_ms"]
+        if new_ms > old_ms * time_ratio and new_ms - old_ms > min_time_ms:
+            regressions.append((name, "time", f"{old_ms:.3f} ms -> {new_ms:.3f} ms ({new_ms / max(old_ms, 1e-9):.1f}x)"))
+
+        old_buffers = old["shared_hit_blocks"] + old["shared_read_blocks"]
+        new_buffers = new["shared_hit_blocks"] + new["shared_read_blocks"]
+        if new_buffers > old_buffers * buffer_ratio and new_buffers - old_buffers > min_buffers:
+            regressions.append((name, "buffers", f"{old_buffers} -> {new_buffers} shared blocks"))
+        if new["temp_blocks"] > old["temp_blocks"]:
+            regressions.append((name, "temp", f"{old['temp_blocks']} -> {new['temp_blocks']} temp blocks (spilled to disk)"))
+
+        if old["shape"] != new["shape"]:
+            index, (before, after) = next((i, pair) for i, pair in enumerate(zip_longest(old["shape"], new["shape"]))
+                                          if pair[0] != pair[1])
+            regressions.append((name, "plan", f"node {index}: {str(before).strip()} -> {str(after).strip()}"))
+    return regressions
+
+
+def report(regressions, baseline, current):
+    print("\n--- Plan Regression Report ---")
+    print(f"Baseline: {baseline['captured_at']} (PostgreSQL {baseline['server_version']})")
+    print(f"Current:  {current['captured_at']} (PostgreSQL {current['server_version']})")
+    if not regressions:
+        print("No regressions.")
+    for name, kind, detail in regressions:
+        print(f"  {kind.upper():<8} {name}: {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture EXPLAIN ANALYZE plans of the catalogued queries and flag regressions.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    thresholds = argparse.ArgumentParser(add_help=False)
+    thresholds.add_argument("--time-ratio", type=float, default=1.5, help="Flag execution time growing by this factor")
+    thresholds.add_argument("--min-time-ms", type=float, default=1.0, help="...and by at least this many milliseconds")
+    thresholds.add_argument("--buffer-ratio", type=float, default=1.5, help="Flag shared buffers growing by this factor")
+    thresholds.add_argument("--min-buffers", type=int, default=100, help="...and by at least this many blocks")
+
+    capture_parser = subparsers.add_parser("capture", parents=[thresholds], help="Capture plans of all catalogued queries")
+    capture_parser.add_argument("--repeat", type=int, default=3, help="EXPLAIN ANALYZE runs per query (median is kept)")
+    capture_parser.add_argument("--source", action="append", choices=("analytics", "pythonTest", "queries.sql"),
+                                help="Only these query catalogues (default: all)")
+    capture_parser.add_argument("--out", help="Output file (default: PLAN_DIR/<timestamp>.json)")
+    capture_parser.add_argument("--baseline", help="Diff the new run against this plan file")
+
+    diff_parser = subparsers.add_parser("diff", parents=[thresholds], help="Diff two plan files")
+    diff_parser.add_argument("baseline")
+    diff_parser.add_argument("current")
+    args = parser.parse_args(argv)
+
+    if args.command == "capture":
+        from analytics import get_engine
+        queries = catalogue(tuple(args.source) if args.source else ("analytics", "pythonTest", "queries.sql"))
+        print(f"Capturing {len(queries)} queries on {get_engine().url.render_as_string(hide_password=True)} ({args.repeat} runs each)\n")
+        conn = get_engine().raw_connection()
+        try:
+            current = capture(conn, queries, args.repeat)
+        finally:
+            conn.close()
+        print(f"\nSaved: {save_run(current, args.out)}")
+        if not args.baseline:
+            return 0
+        baseline = load_run(args.baseline)
+    else:
+        baseline, current = load_run(args.baseline), load_run(args.current)
+
+    regressions = diff_runs(baseline, current, args.time_ratio, args.min_time_ms, args.buffer_ratio, args.min_buffers)
+    report(regressions, baseline, current)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
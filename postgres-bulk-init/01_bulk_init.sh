@@ -0,0 +1,37 @@
+#!/bin/bash
+# Bulk init for the postgres container (mounted as /docker-entrypoint-initdb.d).
+# Same phases as db_bulk_init.py: bare tables, parallel \copy of /seed_data/*.csv,
+# keys after the load, the 04-06 post scripts, ANALYZE - with a timing per phase.
+set -euo pipefail
+
+SEED_DIR="${SEED_DIR:-/seed_data}"
+INIT_SQL_DIR="${INIT_SQL_DIR:-/init-sql}"
+PSQL=(psql -v ON_ERROR_STOP=1 -q --username "$POSTGRES_USER" --dbname "$POSTGRES_DB")
+
+phase() {
+  local name=$1; shift
+  local started
+  started=$(date +%s%N)
+  "$@"
+  echo ">>> bulk init: $(printf '%-14s' "$name") $(( ($(date +%s%N) - started) / 1000000 )) ms"
+}
+
+load_tables() {
+  local pids=() file table
+  for file in "$SEED_DIR"/*.csv; do
+    table=$(basename "$file" .csv)
+    "${PSQL[@]}" -c "\\copy superhero.\"$table\" FROM '$file' WITH (FORMAT csv, HEADER)" &
+    pids+=($!)
+  done
+  for pid in "${pids[@]}"; do
+    wait "$pid"
+  done
+}
+
+phase "schema"       "${PSQL[@]}" -f "$SEED_DIR/schema.sql"
+phase "load"         load_tables
+phase "constraints"  "${PSQL[@]}" -f "$SEED_DIR/constraints.sql"
+phase "04 post"      "${PSQL[@]}" -f "$INIT_SQL_DIR/04_superset_prep.sql"
+phase "05 post"      "${PSQL[@]}" -f "$INIT_SQL_DIR/05_materialized_views.sql"
+phase "06 post"      "${PSQL[@]}" -f "$INIT_SQL_DIR/06_hero_keys_indexes.sql"
+phase "analyze"      "${PSQL[@]}" -c "ANALYZE"
@@ -0,0 +1,84 @@
+-- # Pre-aggregated materialized views for analytics.py and Superset
+-- Every view has a UNIQUE index, which REFRESH MATERIALIZED VIEW CONCURRENTLY requires:
+-- refreshes (mv_refresh.py) then never block the dashboards reading them.
+-- NULL dimension ids are stored as 0 so the unique keys stay total.
+
+-- 1. Wide per-hero attribute pivot (one row per hero, MAX per attribute like the CASE pivots)
+DROP MATERIALIZED VIEW IF EXISTS superhero.mv_hero_attribute_wide;
+CREATE MATERIALIZED VIEW superhero.mv_hero_attribute_wide AS
+SELECT
+    s.id AS hero_id,
+    s.superhero_name,
+    COALESCE(s.publisher_id, 0) AS publisher_id,
+    p.publisher_name,
+    COALESCE(s.race_id, 0) AS race_id,
+    r.race,
+    COALESCE(s.alignment_id, 0) AS alignment_id,
+    al.alignment,
+    MAX(CASE WHEN a.attribute_name = 'Intelligence' THEN ha.attribute_value END) AS intelligence,
+    MAX(CASE WHEN a.attribute_name = 'Strength' THEN ha.attribute_value END) AS strength,
+    MAX(CASE WHEN a.attribute_name = 'Speed' THEN ha.attribute_value END) AS speed,
+    MAX(CASE WHEN a.attribute_name = 'Durability' THEN ha.attribute_value END) AS durability,
+    MAX(CASE WHEN a.attribute_name = 'Power' THEN ha.attribute_value END) AS power,
+    MAX(CASE WHEN a.attribute_name = 'Combat' THEN ha.attribute_value END) AS combat,
+    COALESCE(SUM(ha.attribute_value), 0) AS total_attributes
+FROM superhero.superhero s
+LEFT JOIN superhero.publisher p ON s.publisher_id = p.id
+LEFT JOIN superhero.race r ON s.race_id = r.id
+LEFT JOIN superhero.alignment al ON s.alignment_id = al.id
+LEFT JOIN superhero.hero_attribute ha ON s.id = ha.hero_id
+LEFT JOIN superhero.attribute a ON ha.attribute_id = a.id
+GROUP BY s.id, s.superhero_name, s.publisher_id, p.publisher_name, s.race_id, r.race, s.alignment_id, al.alignment
+WITH DATA;
+
+CREATE UNIQUE INDEX ux_mv_hero_attribute_wide ON superhero.mv_hero_attribute_wide (hero_id);
+CREATE INDEX ix_mv_hero_attribute_wide_publisher ON superhero.mv_hero_attribute_wide (publisher_name);
+CREATE INDEX ix_mv_hero_attribute_wide_total ON superhero.mv_hero_attribute_wide (total_attributes DESC);
+
+
+-- 2. Power counts per publisher (Power X Publisher sheet, publisher power bar chart)
+DROP MATERIALIZED VIEW IF EXISTS superhero.mv_publisher_power_counts;
+CREATE MATERIALIZED VIEW superhero.mv_publisher_power_counts AS
+SELECT
+    p.id AS publisher_id,
+    p.publisher_name,
+    sp.id AS power_id,
+    sp.power_name,
+    COUNT(DISTINCT hp.hero_id) AS heroes_with_power,
+    COUNT(*) AS power_assignments
+FROM superhero.hero_power hp
+JOIN superhero.superpower sp ON hp.power_id = sp.id
+JOIN superhero.superhero s ON hp.hero_id = s.id
+JOIN superhero.publisher p ON s.publisher_id = p.id
+GROUP BY p.id, p.publisher_name, sp.id, sp.power_name
+WITH DATA;
+
+CREATE UNIQUE INDEX ux_mv_publisher_power_counts ON superhero.mv_publisher_power_counts (publisher_id, power_id);
+CREATE INDEX ix_mv_publisher_power_counts_power ON superhero.mv_publisher_power_counts (power_name, heroes_with_power DESC);
+
+
+-- 3. Attribute averages per race and alignment (sum/count kept so coarser roll-ups stay exact)
+DROP MATERIALIZED VIEW IF EXISTS superhero.mv_race_alignment_attribute_avg;
+CREATE MATERIALIZED VIEW superhero.mv_race_alignment_attribute_avg AS
+SELECT
+    COALESCE(s.race_id, 0) AS race_id,
+    r.race,
+    COALESCE(s.alignment_id, 0) AS alignment_id,
+    al.alignment,
+    a.id AS attribute_id,
+    a.attribute_name,
+    COUNT(ha.attribute_value) AS value_count,
+    SUM(ha.attribute_value) AS sum_value,
+    AVG(ha.attribute_value)::numeric(8,2) AS avg_value
+FROM superhero.hero_attribute ha
+JOIN superhero.attribute a ON ha.attribute_id = a.id
+JOIN superhero.superhero s ON ha.hero_id = s.id
+LEFT JOIN superhero.race r ON s.race_id = r.id
+LEFT JOIN superhero.alignment al ON s.alignment_id = al.id
+GROUP BY COALESCE(s.race_id, 0), r.race, COALESCE(s.alignment_id, 0), al.alignment, a.id, a.attribute_name
+WITH DATA;
+
+CREATE UNIQUE INDEX ux_mv_race_alignment_attribute_avg
+    ON superhero.mv_race_alignment_attribute_avg (race_id, alignment_id, attribute_id);
+CREATE INDEX ix_mv_race_alignment_attribute_avg_attribute
+    ON superhero.mv_race_alignment_attribute_avg (attribute_name, race, alignment);
@@ -0,0 +1,80 @@
+-- # Keys and covering indexes for the hero link tables
+-- hero_attribute and hero_power were created with foreign keys only, so every join on
+-- hero_id and every attribute_id / power_id filter was a sequential scan.
+-- Idempotent: safe on a fresh database, on an existing one and after the bulk init
+-- (the bulk init builds the same keys and indexes under the same names in the
+-- @primary-keys phase of seed_data/constraints.sql, so here they are no-ops).
+
+-- 1. Rows that cannot be part of a composite key. Rows with a NULL key column and
+--    exact duplicates (every column equal) are deleted and counted in a NOTICE.
+--    Rows sharing a key with a different attribute_value are conflicting data:
+--    the script stops with an error instead of choosing one of them.
+DO $$
+DECLARE
+  conflicts text;
+  n bigint;
+BEGIN
+  SELECT string_agg(format('(hero_id %s, attribute_id %s)', hero_id, attribute_id), ', ')
+  INTO conflicts
+  FROM (SELECT hero_id, attribute_id FROM superhero.hero_attribute
+        WHERE hero_id IS NOT NULL AND attribute_id IS NOT NULL
+        GROUP BY hero_id, attribute_id
+        HAVING COUNT(DISTINCT attribute_value) > 1
+            OR (COUNT(*) > 1 AND COUNT(attribute_value) BETWEEN 1 AND COUNT(*) - 1)
+        LIMIT 20) c;
+  IF conflicts IS NOT NULL THEN
+    RAISE EXCEPTION 'superhero.hero_attribute has keys with different attribute_value rows: %', conflicts
+      USING HINT = 'Resolve them by hand, then re-run 06_hero_keys_indexes.sql';
+  END IF;
+
+  DELETE FROM superhero.hero_attribute WHERE hero_id IS NULL OR attribute_id IS NULL;
+  GET DIAGNOSTICS n = ROW_COUNT;
+  IF n > 0 THEN RAISE NOTICE 'hero_attribute: deleted % rows with a NULL key column', n; END IF;
+  DELETE FROM superhero.hero_attribute a
+  USING superhero.hero_attribute b
+  WHERE a.hero_id = b.hero_id AND a.attribute_id = b.attribute_id
+    AND a.attribute_value IS NOT DISTINCT FROM b.attribute_value AND a.ctid > b.ctid;
+  GET DIAGNOSTICS n = ROW_COUNT;
+  IF n > 0 THEN RAISE NOTICE 'hero_attribute: deleted % exact duplicate rows', n; END IF;
+
+  DELETE FROM superhero.hero_power WHERE hero_id IS NULL OR power_id IS NULL;
+  GET DIAGNOSTICS n = ROW_COUNT;
+  IF n > 0 THEN RAISE NOTICE 'hero_power: deleted % rows with a NULL key column', n; END IF;
+  -- (hero_id, power_id) are all of hero_power's columns: same key = exact duplicate
+  DELETE FROM superhero.hero_power a
+  USING superhero.hero_power b
+  WHERE a.hero_id = b.hero_id AND a.power_id = b.power_id AND a.ctid > b.ctid;
+  GET DIAGNOSTICS n = ROW_COUNT;
+  IF n > 0 THEN RAISE NOTICE 'hero_power: deleted % exact duplicate rows', n; END IF;
+END $$;
+
+-- 2. Composite primary keys: (hero_id, ...) also serves every join on hero_id
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'pk_hero_attribute'
+                 AND conrelid = 'superhero.hero_attribute'::regclass) THEN
+    ALTER TABLE superhero.hero_attribute ADD CONSTRAINT pk_hero_attribute PRIMARY KEY (hero_id, attribute_id);
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'pk_hero_power'
+                 AND conrelid = 'superhero.hero_power'::regclass) THEN
+    ALTER TABLE superhero.hero_power ADD CONSTRAINT pk_hero_power PRIMARY KEY (hero_id, power_id);
+  END IF;
+END $$;
+
+-- 3. Reverse lookups: "WHERE attribute_id = ?" aggregates become index-only scans
+CREATE INDEX IF NOT EXISTS ix_hero_attribute_attribute_hero
+    ON superhero.hero_attribute (attribute_id, hero_id) INCLUDE (attribute_value);
+CREATE INDEX IF NOT EXISTS ix_hero_power_power_hero
+    ON superhero.hero_power (power_id, hero_id);
+
+-- 4. Statement statistics for index_advisor.py (the server needs
+--    shared_preload_libraries=pg_stat_statements, see docker-compose.yml)
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_stat_statements') THEN
+    CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
+  END IF;
+END $$;
+
+ANALYZE superhero.hero_attribute;
+ANALYZE superhero.hero_power;
@@ -1,3 +1,5 @@
+import os
+
 import pandas as pd
 import psycopg2
 
@@ -98,6 +100,16 @@ def run_query(conn, sql):
     return pd.read_sql(sql, conn)
 
 def main():
+    # SNAPSHOT_DIR: run on a Parquet snapshot (offline_engine.py snapshot) instead of Postgres
+    snapshot_dir = os.environ.get("SNAPSHOT_DIR")
+    if snapshot_dir:
+        from offline_engine import OfflineEngine
+        engine = OfflineEngine(snapshot_dir)
+        for name, q in QUERIES.items():
+            print(f"\n--- Running query: {name} ---")
+            print(engine.query(q).to_string(index=False))
+        return
+
     conn = get_connection()
     try:
         with conn.cursor() as cur:
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Reproducible query benchmark suite
+
+Builds its own fixture database from the CSV seed data (db_bulk_init.py,
+optionally scaled up with synth_data.py), then
+times every query of pythonTest.QUERIES and of the analytics.py query set:
+warm-up runs first, then N timed repetitions (execute + fetch all rows) per
+query, reporting p50/p95/p99 latency and rows per second. Results are written
+as JSON so runs can be compared across commits.
+
+    python query_bench.py run                          # fixture + benchmark -> bench_results/*.json
+    python query_bench.py run --scale 100 --repeat 50
+    python query_bench.py compare bench_results/a.json bench_results/b.json
+"""
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+from db_bulk_init import SEED_DIR, INIT_SCRIPTS_DIR, POST_SCRIPTS, bulk_init, connect
+
+RESULTS_FORMAT_VERSION = 1
+BENCH_DB = os.environ.get("BENCH_DB", "superheroes_bench")
+RESULTS_DIR = os.environ.get("BENCH_RESULTS_DIR", "bench_results")
+
+
+# --- FIXTURE ---
+
+def fixture_key(scale, seed):
+    """Identifies a fixture: the seed data and post scripts' content plus the synthetic scale and seed."""
+    digest = hashlib.sha256()
+    inputs = sorted(glob.glob(os.path.join(SEED_DIR, "*")))
+    inputs += [os.path.join(INIT_SCRIPTS_DIR, name) for name in POST_SCRIPTS]
+    for path in inputs:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(f"{scale}:{seed}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def bench_url(database=BENCH_DB):
+    from sqlalchemy.engine import make_url
+    from analytics import Config
+    return make_url(Config.DB_URL).set(database=database)
+
+
+def build_fixture(scale=0.0, seed=42, rebuild=False):
+    """Creates BENCH_DB from the seed data (+ synthetic heroes); reused while its key matches."""
+    key = fixture_key(scale, seed)
+    url = bench_url()
+
+    admin = connect(bench_url("postgres"))
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (url.database,))
+            exists = cur.fetchone() is not None
+        if exists and not rebuild:
+            conn = connect(url)
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT obj_description('superhero'::regnamespace)")
+                    if cur.fetchone()[0] == f"bench fixture {key}":
+                        print(f"Fixture {url.database} is up to date ({key}).")
+                        return url
+            except Exception:
+                pass
+            finally:
+                conn.close()
+        with admin.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{url.database}"')
+            cur.execute(f'CREATE DATABASE "{url.database}"')
+    finally:
+        admin.close()
+
+    started = time.perf_counter()
+    bulk_init(url)
+    conn = connect(url)
+    conn.autocommit = True
+    try:
+        if scale > 0:
+            import synth_data
+            conn.autocommit = False
+            profile = synth_data.ReferenceProfile.load(conn)
+            first_id = int(profile.heroes["id"].max()) + 1
+            generator = synth_data.SyntheticGenerator(profile, int(round(scale * len(profile))), first_id, seed)
+            synth_data.load(conn, generator)
+            conn.autocommit = True
+        with conn.cursor() as cur:
+            # The pre-aggregated views must reflect the synthetic rows too
+            cur.execute("SELECT matviewname FROM pg_matviews WHERE schemaname = 'superhero'")
+            for (view,) in cur.fetchall():
+                cur.execute(f'REFRESH MATERIALIZED VIEW "superhero"."{view}"')
+            cur.execute("VACUUM ANALYZE")
+            cur.execute(f"COMMENT ON SCHEMA superhero IS 'bench fixture {key}'")
+    finally:
+        conn.close()
+    print(f"Built fixture {url.database} ({key}, scale={scale}) in {time.perf_counter() - started:.1f}s.")
+    return url
+
+
+# --- BENCHMARK ---
+
+def time_query(conn, sql, warmup, repeat):
+    """Returns (rows, latencies in ms) of `repeat` timed execute+fetchall runs after `warmup` runs."""
+    latencies = []
+    rows = 0
+    with conn.cursor() as cur:
+        for i in range(warmup + repeat):
+            started = time.perf_counter()
+            cur.execute(sql)
+            rows = len(cur.fetchall())
+            elapsed = (time.perf_counter() - started) * 1000.0
+            if i >= warmup:
+                latencies.append(elapsed)
+    conn.rollback()
+    return rows, latencies
+
+
+def summarize(rows, latencies):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "rows": rows,
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "mean_ms": round(float(np.mean(latencies)), 4),
+        "min_ms": round(float(np.min(latencies)), 4),
+        "max_ms": round(float(np.max(latencies)), 4),
+        "rows_per_s": round(rows / (p50 / 1000.0), 1) if p50 > 0 else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(url, queries, warmup=3, repeat=20):
+    conn = connect(url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            server_version = cur.fetchone()[0]
+            cur.execute("SET search_path TO superhero, public")
+        conn.commit()
+
+        results = {}
+        print(f"\n{'query':<50} {'rows':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rows/s':>12}")
+        for name, (sql, _) in queries.items():
+            try:
+                stats = summarize(*time_query(conn, sql, warmup, repeat))
+            except Exception as e:
+                conn.rollback()
+                results[name] = {"error": str(e).strip().splitlines()[0]}
+                print(f"{name:<50} ERROR: {results[name]['error']}", file=sys.stderr)
+                continue
+            results[name] = stats
+            print(f"{name:<50} {stats['rows']:>8} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+                  f"{stats['rows_per_s'] or 0:>12,.0f}")
+    finally:
+        conn.close()
+
+    return {
+        "version": RESULTS_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "server_version": server_version,
+        "settings": {"warmup": warmup, "repeat": repeat},
+        "queries": results,
+    }
+
+
+def save_results(results, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = results["created_at"].replace(":", "").replace("-", "").replace("+0000", "Z")
+        path = os.path.join(RESULTS_DIR, f"{results['git_commit'] or 'nogit'}-{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    return path
+
+
+def compare(baseline, current, threshold=1.2):
+    """Prints p50/p95 change per query; returns the queries whose p50 grew beyond `threshold`."""
+    if baseline.get("fixture") != current.get("fixture"):
+        print(f"WARNING: different fixtures ({baseline.get('fixture')} vs {current.get('fixture')})")
+    print(f"\n--- Benchmark Comparison: {baseline.get('git_commit')} -> {current.get('git_commit')} ---")
+    print(f"{'query':<50} {'p50 before':>11} {'p50 after':>11} {'change':>8} {'p95 change':>11}")
+    regressed = []
+    for name, new in current["queries"].items():
+        old = baseline["queries"].get(name)
+        if not old or "error" in old or "error" in new:
+            continue
+        ratio = new["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("inf")
+        ratio_p95 = new["p95_ms"] / old["p95_ms"] if old["p95_ms"] else float("inf")
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(f"{name:<50} {old['p50_ms']:>11.3f} {new['p50_ms']:>11.3f} {ratio:>7.2f}x {ratio_p95:>10.2f}x{flag}")
+        if ratio > threshold:
+            regressed.append(name)
+    print(f"{len(regressed)} queries slower than {threshold:.2f}x at p50.")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the catalogued superhero queries on a self-built fixture database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Build/reuse the fixture and benchmark every query")
+    run_parser.add_argument("--scale", type=float, default=0.0, help="Synthetic heroes per reference hero added by synth_data.py")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--rebuild-fixture", action="store_true")
+    run_parser.add_argument("--warmup", type=int, default=3)
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument("--out", help="Results file (default: BENCH_RESULTS_DIR/<commit>-<timestamp>.json)")
+    run_parser.add_argument("--baseline", help="Compare the new results against this results file")
+    run_parser.add_argument("--threshold", type=float, default=1.2)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        from plan_capture import catalogue
+        url = build_fixture(args.scale, args.seed, args.rebuild_fixture)
+        results = run_benchmark(url, catalogue(("analytics", "pythonTest")), args.warmup, args.repeat)
+        results["fixture"] = {"database": url.database, "key": fixture_key(args.scale, args.seed),
+                              "scale": args.scale, "seed": args.seed}
+        print(f"\nSaved: {save_results(results, args.out)}")
+        if not args.baseline:
+            return 0
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            results = json.load(f)
+
+    return 1 if compare(baseline, results, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
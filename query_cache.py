@@ -0,0 +1,184 @@
+"""
+Persistent result cache for analytics.run_query
+
+Query results are stored as Parquet files keyed by the normalized SQL text.
+Every entry remembers the change watermark of the tables it reads; a lookup is
+a hit only while that watermark is unchanged, so a report on an unchanged
+database never reaches the heavy join path. The cache directory is bounded in
+size and evicts least-recently-used entries. Hits only touch the in-memory
+index; last-used times reach index.json with the next put(), flush() or at
+interpreter exit.
+"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+INDEX_FILE = "index.json"
+
+# "superhero"."hero_attribute" / superhero.hero_attribute -> hero_attribute
+_TABLE_REF = re.compile(r'"?superhero"?\s*\.\s*"?([A-Za-z_][A-Za-z0-9_]*)"?', re.IGNORECASE)
+_LINE_COMMENT = re.compile(r'--[^\n]*')
+
+
+def normalize_sql(sql):
+    """Drops line comments, collapses whitespace and the trailing semicolon."""
+    sql = _LINE_COMMENT.sub(' ', sql)
+    sql = ' '.join(sql.split())
+    return sql.rstrip('; ')
+
+
+def referenced_tables(sql):
+    """Names of the superhero-schema tables a query reads (sorted, unique)."""
+    return sorted({name.lower() for name in _TABLE_REF.findall(sql)})
+
+
+class QueryCache:
+    """Size-bounded LRU cache of query results on disk with hit/miss counters."""
+
+    def __init__(self, directory, max_bytes, watermark):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.watermark = watermark
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._index = self._load_index()
+        atexit.register(self.flush)
+
+    # --- INDEX ---
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _temp_path(self, suffix):
+        """A unique file in the cache directory, so concurrent writers never share a temp file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=suffix)
+        os.close(fd)
+        return tmp_path
+
+    def _replace(self, tmp_path, path, write):
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _save_index(self):
+        def write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, indent=1)
+
+        self._replace(self._temp_path(".json.tmp"), self._index_path, write)
+        self._dirty = False
+
+    def _remove(self, key):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._dirty = True
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except OSError:
+                pass
+
+    # --- PUBLIC API ---
+
+    @staticmethod
+    def key(sql):
+        return hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()
+
+    def get(self, sql):
+        """Returns (DataFrame or None, watermark). Pass the watermark back to put() on a miss."""
+        key = self.key(sql)
+        mark = self.watermark(referenced_tables(sql))
+
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry or entry["watermark"] != mark:
+                self.misses += 1
+                return None, mark
+
+        # Read outside the lock: put() replaces files atomically, so the worst case
+        # is a file evicted meanwhile, which is a miss
+        try:
+            df = pd.read_parquet(os.path.join(self.directory, entry["file"]))
+        except (OSError, ValueError):
+            df = None
+
+        with self._lock:
+            if df is None:
+                if self._index.get(key) is entry:
+                    self._remove(key)
+                self.misses += 1
+                return None, mark
+            entry["last_used"] = time.time()
+            self.hits += 1
+            self._dirty = True
+            return df, mark
+
+    def put(self, sql, df, mark):
+        """Stores a result fetched while the tables were at watermark `mark`."""
+        key = self.key(sql)
+        filename = f"{key}.parquet"
+        path = os.path.join(self.directory, filename)
+
+        self._replace(self._temp_path(".parquet.tmp"), path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+
+        with self._lock:
+            self._index[key] = {
+                "file": filename,
+                "watermark": mark,
+                "size": os.path.getsize(path),
+                "last_used": time.time(),
+                "sql": normalize_sql(sql)[:200],
+            }
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            self._remove(key)
+            self.evictions += 1
+
+    def flush(self):
+        """Writes the index if hits changed last-used times since the last save."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+    def report(self):
+        size = sum(entry["size"] for entry in self._index.values())
+        lookups = self.hits + self.misses
+        hit_rate = 100.0 * self.hits / lookups if lookups else 0.0
+        print("\n--- Result Cache Report ---")
+        print(f"Hits: {self.hits}, misses: {self.misses} ({hit_rate:.0f}% hit rate), evictions: {self.evictions}")
+        print(f"Entries: {len(self._index)}, size: {size / 1024:.1f} KiB of {self.max_bytes / 1024:.0f} KiB ({self.directory})")
@@ -0,0 +1,66 @@
+-- # Bulk init, phase 3: keys and indexes, built once over the loaded data.
+-- Statements are separated by blank lines; each primary-key block only touches its own
+-- table, so db_bulk_init.py runs them in parallel before the foreign keys.
+
+-- @primary-keys
+ALTER TABLE "superhero"."alignment" ADD CONSTRAINT pk_alignment PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."attribute" ADD CONSTRAINT pk_attribute PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."colour" ADD CONSTRAINT pk_colour PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."comic" ADD CONSTRAINT pk_comic PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."gender" ADD CONSTRAINT pk_gender PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."publisher" ADD CONSTRAINT pk_publisher PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."race" ADD CONSTRAINT pk_race PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."superhero" ADD CONSTRAINT pk_superhero PRIMARY KEY (id);
+
+ALTER TABLE "superhero"."superpower" ADD CONSTRAINT pk_superpower PRIMARY KEY (id);
+
+-- Composite keys and reverse-lookup covering indexes of the link tables
+-- (same names as postgres-init-scripts/06_hero_keys_indexes.sql, which then has nothing to do)
+ALTER TABLE "superhero"."hero_attribute" ADD CONSTRAINT pk_hero_attribute PRIMARY KEY (hero_id, attribute_id);
+CREATE INDEX ix_hero_attribute_attribute_hero ON "superhero"."hero_attribute" (attribute_id, hero_id) INCLUDE (attribute_value);
+
+ALTER TABLE "superhero"."hero_power" ADD CONSTRAINT pk_hero_power PRIMARY KEY (hero_id, power_id);
+CREATE INDEX ix_hero_power_power_hero ON "superhero"."hero_power" (power_id, hero_id);
+
+-- @foreign-keys
+ALTER TABLE "superhero"."superhero"
+  ADD CONSTRAINT fk_sup_align FOREIGN KEY (alignment_id) REFERENCES "superhero"."alignment" (id),
+  ADD CONSTRAINT fk_sup_eyecol FOREIGN KEY (eye_colour_id) REFERENCES "superhero"."colour" (id),
+  ADD CONSTRAINT fk_sup_gen FOREIGN KEY (gender_id) REFERENCES "superhero"."gender" (id),
+  ADD CONSTRAINT fk_sup_haircol FOREIGN KEY (hair_colour_id) REFERENCES "superhero"."colour" (id),
+  ADD CONSTRAINT fk_sup_pub FOREIGN KEY (publisher_id) REFERENCES "superhero"."publisher" (id),
+  ADD CONSTRAINT fk_sup_race FOREIGN KEY (race_id) REFERENCES "superhero"."race" (id),
+  ADD CONSTRAINT fk_sup_skincol FOREIGN KEY (skin_colour_id) REFERENCES "superhero"."colour" (id);
+
+ALTER TABLE "superhero"."hero_attribute"
+  ADD CONSTRAINT fk_hat_at FOREIGN KEY (attribute_id) REFERENCES "superhero"."attribute" (id),
+  ADD CONSTRAINT fk_hat_hero FOREIGN KEY (hero_id) REFERENCES "superhero"."superhero" (id);
+
+ALTER TABLE "superhero"."hero_power"
+  ADD CONSTRAINT fk_hpo_hero FOREIGN KEY (hero_id) REFERENCES "superhero"."superhero" (id),
+  ADD CONSTRAINT fk_hpo_po FOREIGN KEY (power_id) REFERENCES "superhero"."superpower" (id);
+
+-- @identities
+-- Identity columns continue after the explicitly loaded ids
+DO $$
+DECLARE
+  t record;
+  max_id int;
+BEGIN
+  FOR t IN SELECT c.relname FROM pg_class c
+           JOIN pg_attribute a ON a.attrelid = c.oid AND a.attname = 'id' AND a.attidentity <> ''
+           WHERE c.relnamespace = 'superhero'::regnamespace AND c.relkind = 'r'
+  LOOP
+    EXECUTE format('SELECT MAX(id) FROM superhero.%I', t.relname) INTO max_id;
+    IF max_id IS NOT NULL THEN
+      PERFORM setval(pg_get_serial_sequence(format('superhero.%I', t.relname), 'id'), max_id);
+    END IF;
+  END LOOP;
+END $$;
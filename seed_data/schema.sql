@@ -0,0 +1,73 @@
+-- # Bulk init, phase 1: bare tables (no keys, no indexes) so COPY runs without per-row checks.
+-- Constraints and indexes are created after the load by constraints.sql.
+DROP SCHEMA IF EXISTS "superhero" CASCADE;
+CREATE SCHEMA "superhero";
+
+CREATE TABLE "superhero"."alignment" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  alignment varchar(10) DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."attribute" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  attribute_name varchar(200) DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."colour" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  colour varchar(20) DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."comic" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  comic_name varchar(200) DEFAULT NULL,
+  issue INT DEFAULT NULL,
+  publish_month INT DEFAULT NULL,
+  publish_year INT DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."gender" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  gender varchar(20) DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."publisher" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  publisher_name varchar(50) DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."race" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  race varchar(100) DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."superhero" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  superhero_name varchar(200) DEFAULT NULL,
+  full_name varchar(200) DEFAULT NULL,
+  gender_id INT DEFAULT NULL,
+  eye_colour_id INT DEFAULT NULL,
+  hair_colour_id INT DEFAULT NULL,
+  skin_colour_id INT DEFAULT NULL,
+  race_id INT DEFAULT NULL,
+  publisher_id INT DEFAULT NULL,
+  alignment_id INT DEFAULT NULL,
+  height_cm INT DEFAULT NULL,
+  weight_kg INT DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."superpower" (
+  id INT NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+  power_name varchar(200) DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."hero_attribute" (
+  hero_id INT DEFAULT NULL,
+  attribute_id INT DEFAULT NULL,
+  attribute_value INT DEFAULT NULL
+);
+
+CREATE TABLE "superhero"."hero_power" (
+  hero_id INT DEFAULT NULL,
+  power_id INT DEFAULT NULL
+);
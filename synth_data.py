@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Scale-factor synthetic data generator
+
+Builds a statistically similar superhero / hero_attribute / hero_power dataset
+at a chosen scale factor of the reference data already in the database:
+
+* every synthetic hero copies the publisher, race, alignment, gender, colours
+  and power count of a uniformly drawn reference hero ("template"), so the
+  dimension distributions (joint, not only marginal) and the per-hero power
+  count distribution are preserved;
+* attribute values are the template's, jittered and rounded to steps of 5;
+* powers are drawn without replacement, weighted by reference popularity.
+
+Output is deterministic for a given --seed and streamed batch by batch into
+Postgres with COPY FROM STDIN (one transaction), so memory stays bounded.
+
+    python synth_data.py --scale 100                  # append 100x the reference heroes
+    python synth_data.py --scale 10000 --replace --profile reference.pkl
+                                                      # replace the tables with 10 000x
+
+Without --profile the reference is whatever the tables hold, so a second
+--replace run would sample from the previous synthetic data.
+"""
+import io
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+HERO_COLUMNS = ["id", "superhero_name", "full_name", "gender_id", "eye_colour_id", "hair_colour_id",
+                "skin_colour_id", "race_id", "publisher_id", "alignment_id", "height_cm", "weight_kg"]
+# Copied verbatim from the template hero
+DIMENSION_COLUMNS = ["full_name", "gender_id", "eye_colour_id", "hair_colour_id", "skin_colour_id",
+                     "race_id", "publisher_id", "alignment_id"]
+
+
+class IteratorFile(io.TextIOBase):
+    """Read-only text file over an iterator of string chunks, for cursor.copy_expert()."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._chunk = ""
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while self._pos >= len(self._chunk):
+            self._chunk = next(self._chunks, None)
+            self._pos = 0
+            if self._chunk is None:
+                self._chunk = ""
+                return ""
+        end = len(self._chunk) if size is None or size < 0 else self._pos + size
+        data = self._chunk[self._pos:end]
+        self._pos += len(data)
+        return data
+
+
+class ReferenceProfile:
+    """Empirical distributions of the reference dataset, used as generation templates."""
+
+    def __init__(self, df_heroes, df_hero_attribute, df_hero_power):
+        self.heroes = df_heroes.reset_index(drop=True)
+        hero_index = pd.Index(self.heroes["id"])
+
+        # Template attribute matrix (NaN = no value), columns ordered by attribute_id
+        self.attribute_ids = np.sort(df_hero_attribute["attribute_id"].dropna().unique()).astype(np.int64)
+        self.attributes = np.full((len(self.heroes), len(self.attribute_ids)), np.nan)
+        rows = hero_index.get_indexer(df_hero_attribute["hero_id"])
+        cols = np.searchsorted(self.attribute_ids, df_hero_attribute["attribute_id"])
+        values = pd.to_numeric(df_hero_attribute["attribute_value"]).to_numpy(dtype=float)
+        valid = (rows >= 0) & ~np.isnan(values)
+        self.attributes[rows[valid], cols[valid]] = values[valid]
+
+        # Distinct powers per template hero, and power popularity
+        powers = df_hero_power.dropna().drop_duplicates()
+        self.power_ids = np.sort(powers["power_id"].unique()).astype(np.int64)
+        counts = powers.groupby("hero_id").size()
+        self.power_counts = counts.reindex(self.heroes["id"], fill_value=0).to_numpy(dtype=np.int64)
+        popularity = powers["power_id"].value_counts().reindex(self.power_ids, fill_value=0).to_numpy(dtype=float)
+        self.power_log_weights = np.log(popularity / popularity.sum())
+
+    @classmethod
+    def load(cls, conn, path=None):
+        """Reads the templates from the superhero schema (ordered, so generation is reproducible).
+
+        With `path`, the reference frames are read from that file if it exists and
+        written to it otherwise, pinning the reference across --replace runs.
+        """
+        if path and os.path.exists(path):
+            return cls(*pd.read_pickle(path))
+        def read(sql):
+            # pd.read_sql only supports SQLAlchemy connectables (and sqlite3) without a warning
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                return pd.DataFrame(cur.fetchall(), columns=[desc[0] for desc in cur.description])
+
+        frames = (
+            read(f"SELECT {', '.join(HERO_COLUMNS)} FROM superhero.superhero ORDER BY id"),
+            read("SELECT hero_id, attribute_id, attribute_value FROM superhero.hero_attribute ORDER BY hero_id, attribute_id"),
+            read("SELECT hero_id, power_id FROM superhero.hero_power ORDER BY hero_id, power_id"),
+        )
+        if path:
+            pd.to_pickle(frames, path)
+        return cls(*frames)
+
+    def __len__(self):
+        return len(self.heroes)
+
+
+class SyntheticGenerator:
+    """Generates hero batches; batch k depends only on (seed, k)."""
+
+    def __init__(self, profile, n_heroes, first_id=1, seed=0, batch_size=20000, jitter=5.0):
+        self.profile = profile
+        self.n_heroes = n_heroes
+        self.first_id = first_id
+        self.batch_size = batch_size
+        self.jitter = jitter
+        self._seeds = np.random.SeedSequence(seed).spawn((n_heroes + batch_size - 1) // batch_size)
+
+    def batches(self):
+        """Yields (df_superhero, df_hero_attribute, df_hero_power) per batch of heroes."""
+        for k, seed in enumerate(self._seeds):
+            start = k * self.batch_size
+            yield self.batch(np.random.default_rng(seed), start, min(self.batch_size, self.n_heroes - start))
+
+    def batch(self, rng, start, size):
+        profile = self.profile
+        ids = np.arange(self.first_id + start, self.first_id + start + size, dtype=np.int64)
+        templates = rng.integers(0, len(profile), size)
+        source = profile.heroes.iloc[templates].reset_index(drop=True)
+
+        heroes = pd.DataFrame({"id": ids})
+        heroes["superhero_name"] = source["superhero_name"].fillna("Hero").astype(str) + " #" + pd.Series(ids).astype(str)
+        for col in DIMENSION_COLUMNS:
+            heroes[col] = source[col].astype("Int64") if col != "full_name" else source[col]
+        for col in ("height_cm", "weight_kg"):
+            base = pd.to_numeric(source[col]).to_numpy(dtype=float)
+            scaled = np.round(base * rng.normal(1.0, 0.05, size))
+            heroes[col] = pd.array(np.where(np.isnan(scaled), np.nan, np.maximum(scaled, 0)), dtype="Int64")
+
+        # Attributes: template values + noise, rounded to steps of 5 within [0, 100]
+        values = profile.attributes[templates]
+        values = np.clip(np.round((values + rng.normal(0.0, self.jitter, values.shape)) / 5) * 5, 0, 100)
+        rows, cols = np.nonzero(~np.isnan(values))
+        hero_attribute = pd.DataFrame({
+            "hero_id": ids[rows],
+            "attribute_id": profile.attribute_ids[cols],
+            "attribute_value": values[rows, cols].astype(np.int64),
+        })
+
+        # Powers: weighted sampling without replacement via Gumbel top-k, k = template power count
+        counts = np.minimum(profile.power_counts[templates], np.isfinite(profile.power_log_weights).sum())
+        keys = profile.power_log_weights + rng.gumbel(size=(size, len(profile.power_ids)))
+        order = np.argsort(-keys, axis=1)
+        chosen = order[np.arange(order.shape[1]) < counts[:, None]]
+        hero_power = pd.DataFrame({"hero_id": np.repeat(ids, counts), "power_id": profile.power_ids[chosen]})
+
+        return heroes, hero_attribute, hero_power
+
+
+def _csv_chunks(frames, counter):
+    for df in frames:
+        counter[0] += len(df)
+        yield df.to_csv(index=False, header=False, na_rep="")
+
+
+def copy_frames(cursor, table, columns, frames):
+    """COPY ... FROM STDIN (CSV) of a DataFrame stream; returns the row count."""
+    counter = [0]
+    cursor.copy_expert(
+        f"COPY superhero.{table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        IteratorFile(_csv_chunks(frames, counter)),
+        size=1 << 20,
+    )
+    return counter[0]
+
+
+# Foreign keys declared on the loaded tables, to drop before COPY and re-add after
+FOREIGN_KEYS_SQL = """
+SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid)
+FROM pg_constraint c
+WHERE c.contype = 'f'
+  AND c.conrelid IN ('superhero.superhero'::regclass, 'superhero.hero_attribute'::regclass, 'superhero.hero_power'::regclass)
+ORDER BY 1, 2
+"""
+
+
+def load(conn, generator, replace=False):
+    """Streams all batches into the three tables in one transaction; returns {phase: (rows, seconds)}.
+
+    The foreign keys are dropped for the COPY and re-added at the end, still inside
+    the transaction: one validating join per key instead of a trigger call per row.
+    """
+    stats = {"superhero": [0, 0.0], "hero_attribute": [0, 0.0], "hero_power": [0, 0.0], "foreign keys": [0, 0.0]}
+    columns = {
+        "superhero": HERO_COLUMNS,
+        "hero_attribute": ["hero_id", "attribute_id", "attribute_value"],
+        "hero_power": ["hero_id", "power_id"],
+    }
+    try:
+        with conn.cursor() as cur:
+            cur.execute(FOREIGN_KEYS_SQL)
+            foreign_keys = cur.fetchall()
+            for table, name, _ in foreign_keys:
+                cur.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+            if replace:
+                cur.execute("TRUNCATE superhero.hero_attribute, superhero.hero_power, superhero.superhero")
+
+            for frames in generator.batches():
+                for table, df in zip(columns, frames):
+                    started = time.perf_counter()
+                    stats[table][0] += copy_frames(cur, table, columns[table], [df])
+                    stats[table][1] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            for table, name, definition in foreign_keys:
+                cur.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+            stats["foreign keys"] = [len(foreign_keys), time.perf_counter() - started]
+            cur.execute("SELECT setval(pg_get_serial_sequence('superhero.superhero', 'id'), "
+                        "(SELECT COALESCE(MAX(id), 1) FROM superhero.superhero))")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    with conn.cursor() as cur:
+        for table in columns:
+            cur.execute(f"ANALYZE superhero.{table}")
+    conn.commit()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a scaled, statistically similar superhero dataset and COPY it into Postgres.")
+    parser.add_argument("--scale", type=float, required=True, help="Synthetic heroes per reference hero (1, 100, 10000, ...)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replace", action="store_true", help="TRUNCATE the three tables first (ids start at 1)")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Heroes generated and copied per batch")
+    parser.add_argument("--jitter", type=float, default=5.0, help="Std-dev of the noise added to attribute values")
+    parser.add_argument("--profile", help="Reference snapshot file: created from the database on first use, reused after. "
+                                          "Without it the current table contents are the reference.")
+    args = parser.parse_args(argv)
+
+    from analytics import get_engine
+    conn = get_engine().raw_connection()
+    try:
+        profile = ReferenceProfile.load(conn, args.profile)
+        if not len(profile):
+            print("No reference heroes in superhero.superhero; load the init scripts first.", file=sys.stderr)
+            return 1
+        n_heroes = int(round(args.scale * len(profile)))
+        first_id = 1 if args.replace else int(profile.heroes["id"].max()) + 1
+        expected_powers = n_heroes * profile.power_counts.mean()
+        print(f"Reference: {len(profile)} heroes. Generating {n_heroes} heroes (~{expected_powers:,.0f} hero_power rows), "
+              f"seed={args.seed}, ids from {first_id}.")
+
+        generator = SyntheticGenerator(profile, n_heroes, first_id, args.seed, args.batch_size, args.jitter)
+        started = time.perf_counter()
+        stats = load(conn, generator, replace=args.replace)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    print("\n--- Synthetic Load Report ---")
+    for table, (rows, seconds) in stats.items():
+        if table == "foreign keys":
+            print(f"{table:<16} {rows:>12,} re-added and validated in {seconds:.2f}s")
+        else:
+            print(f"{table:<16} {rows:>12,} rows  {seconds:8.2f}s in COPY  {rows / max(seconds, 1e-9):>12,.0f} rows/s")
+    print(f"Total (generation + COPY + ANALYZE): {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
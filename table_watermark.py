@@ -0,0 +1,50 @@
+"""
+Per-table change watermark for the superhero schema
+
+Shared by the result cache (query_cache.py) and the materialized view refresher
+(mv_refresh.py); it only needs SQLAlchemy, so the refresher does not pull in
+pandas.
+"""
+import threading
+import time
+
+from sqlalchemy import text
+
+
+class PgStatWatermark:
+    """Cheap per-table change watermark from pg_stat_user_tables.
+
+    Combines the insert/update/delete counters with the relation filenode, so
+    TRUNCATE and table rewrites invalidate too. Postgres flushes these counters
+    shortly after commit, so a write is visible to the cache within about a
+    second. One probe covers the whole schema and is reused for `ttl` seconds.
+    """
+
+    PROBE_SQL = text("""
+        SELECT relname, n_tup_ins, n_tup_upd, n_tup_del, pg_relation_filenode(relid) AS filenode
+        FROM pg_stat_user_tables
+        WHERE schemaname = :schema
+    """)
+
+    def __init__(self, engine, schema="superhero", ttl=1.0):
+        self.engine = engine
+        self.schema = schema
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._probed_at = 0.0
+        self._tables = {}
+
+    def _probe(self):
+        with self._lock:
+            if time.monotonic() - self._probed_at > self.ttl:
+                with self.engine.connect() as conn:
+                    rows = conn.execute(self.PROBE_SQL, {"schema": self.schema}).fetchall()
+                self._tables = {row[0]: f"{row[1]}:{row[2]}:{row[3]}:{row[4]}" for row in rows}
+                self._probed_at = time.monotonic()
+            return self._tables
+
+    def __call__(self, tables):
+        current = self._probe()
+        # No recognizable table reference: depend on the whole schema
+        names = tables or sorted(current)
+        return "|".join(f"{name}={current.get(name, 'absent')}" for name in names)
@@ -0,0 +1,37 @@
+"""_COMPARISON over Filter strings taken from EXPLAIN (VERBOSE) on PostgreSQL 16."""
+from index_advisor import _COMPARISON
+
+
+def comparisons(text):
+    return _COMPARISON.findall(text)
+
+
+def test_plain_column():
+    assert comparisons("(hero_attribute.attribute_id = 1)") == [("attribute_id", "=")]
+
+
+def test_cast_column():
+    assert comparisons("((activity_log_1.activity_type)::text = 'query'::text)") == [("activity_type", "=")]
+
+
+def test_nested_cast_with_type_modifier():
+    assert comparisons("(((superhero.full_name)::character varying(20))::text = 'x'::text)") == [("full_name", "=")]
+
+
+def test_several_conditions():
+    assert comparisons("(((superhero.superhero_name)::text ~~ 'Bat%'::text) AND (superhero.height_cm > 180))") == [
+        ("superhero_name", "~~"), ("height_cm", ">")]
+    assert comparisons("((superhero.full_name IS NOT NULL) AND (superhero.publisher_id = 4))") == [
+        ("full_name", "IS NOT NULL"), ("publisher_id", "=")]
+
+
+def test_range_against_expression():
+    assert comparisons("((activity_log_1.value <> '3'::numeric) AND "
+                       "(activity_log_1.created_at > (now() - '01:00:00'::interval)))") == [
+        ("value", "<>"), ("created_at", ">")]
+
+
+def test_function_wrapped_column_is_skipped():
+    assert comparisons("(lower((s.full_name)::text) = 'bruce wayne'::text)") == []
+    assert comparisons("((upper((superhero.superhero_name)::text) = 'X'::text) OR (superhero.weight_kg IS NULL))") == [
+        ("weight_kg", "IS NULL")]
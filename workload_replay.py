@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Workload capture and time-scaled replay
+
+Records real traffic into a replay file and runs it against a target database,
+so schema or index changes can be load-tested with what Superset and
+analytics.py actually send instead of db_load_generator.py's fixed statements.
+
+Capture sources:
+
+* capture-log: a server log written with log_min_duration_statement = 0 (or
+  log_statement = 'all') and the docker image's default log_line_prefix
+  '%m [%p] ' - exact statements, start times and sessions (backend pids):
+
+      ALTER SYSTEM SET log_min_duration_statement = 0; SELECT pg_reload_conf();
+      docker logs superheroes_db 2> postgres.log
+
+* capture-stats: two pg_stat_statements snapshots --seconds apart. Only call
+  counts are known, so the calls of the window are spread randomly over it and
+  over as many sessions as were connected. Normalized statements ($1, $2, ...)
+  are matched against the query catalogue (plan_capture.catalogue) to recover
+  their literal text; the others cannot be replayed and are only counted.
+  Only SELECT / INSERT / UPDATE / DELETE / WITH statements are kept: transaction
+  control (BEGIN / COMMIT, tracked as utility statements), DDL and maintenance,
+  advisory locks and statistics probes would be harmful at random times on
+  random sessions, so they are counted under "skipped" as well.
+
+The replay file is JSON lines: a header, then one event per statement
+{"t": seconds from start, "session": ..., "name": ..., "sql": ..., "duration_ms": ...}.
+
+    python workload_replay.py capture-log postgres.log --out workload.jsonl
+    python workload_replay.py capture-stats --seconds 300 --out workload.jsonl
+    python workload_replay.py replay workload.jsonl --speed 10       # 1 = as captured, 0 = as fast as possible
+    python workload_replay.py replay workload.jsonl --database superheroes_bench --read-only
+"""
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+
+from latency_histogram import LatencyHistogram
+
+WORKLOAD_FORMAT_VERSION = 1
+
+# "2025-01-01 10:00:00.123 UTC [1234] LOG:  duration: 0.512 ms  statement: SELECT ..."
+_LOG_LINE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d+)?)(?: \S+)? \[(\d+)\]\S* (\w+):\s+(.*)$")
+_DURATION = re.compile(r"^duration: ([\d.]+) ms(?:\s+(?:statement|execute [^:]*): (.*))?$", re.DOTALL)
+_STATEMENT = re.compile(r"^(?:statement|execute [^:]*): (.*)$", re.DOTALL)
+_PARAMETERS = re.compile(r"\$(\d+) = ((?:'(?:[^']|'')*')|NULL)")
+_WRITE = re.compile(r"^\s*(insert|update|delete|merge|truncate|create|alter|drop|copy|vacuum|analyze|refresh)\b", re.IGNORECASE)
+_WITH = re.compile(r"^\s*with\b", re.IGNORECASE)
+# A data-modifying CTE: WITH x AS (INSERT ... RETURNING ...) SELECT ... (also catches FOR UPDATE, which locks rows)
+_CTE_WRITE = re.compile(r"\b(insert|update|delete|merge)\b", re.IGNORECASE)
+
+
+def statement_name(sql):
+    """Stable label for one statement shape: literals replaced, whitespace collapsed, hashed."""
+    shape = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    shape = re.sub(r"\b\d+(?:\.\d+)?\b", "?", shape)
+    shape = " ".join(shape.split()).lower()
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:10]
+
+
+def is_write(sql):
+    if _WRITE.match(sql):
+        return True
+    return bool(_WITH.match(sql) and _CTE_WRITE.search(re.sub(r"'(?:[^']|'')*'", "''", sql)))
+
+
+# --- CAPTURE: SERVER LOG ---
+
+def _bind(sql, detail):
+    """Substitutes a 'Parameters: $1 = '...'' DETAIL line into an extended-protocol statement."""
+    values = {int(n): value for n, value in _PARAMETERS.findall(detail)}
+    for n in sorted(values, reverse=True):  # $10 before $1
+        sql = sql.replace(f"${n}", values[n])
+    return sql
+
+
+def parse_log(lines):
+    """Events [(start epoch seconds, pid, sql, duration_ms or None)] of a stderr-format server log."""
+    events = []
+    last_by_pid = {}
+    current = None  # [start, pid, [sql lines], duration, logged_at_end]
+    for raw in lines:
+        line = raw.rstrip("\n")
+        match = _LOG_LINE.match(line)
+        if not match:
+            if current is not None and line.startswith("\t"):
+                current[2].append(line[1:])
+            continue
+        stamp, pid, level, message = match.groups()
+        logged = datetime.strptime(stamp[:26], "%Y-%m-%d %H:%M:%S.%f" if "." in stamp else "%Y-%m-%d %H:%M:%S")
+        if level == "DETAIL" and current is not None and message.lower().startswith("parameters:"):
+            current[2] = [_bind("\n".join(current[2]), message)]
+            continue
+        if level != "LOG":
+            current = None
+            continue
+
+        duration = _DURATION.match(message)
+        statement = _STATEMENT.match(message)
+        if duration and duration.group(2) is None:
+            # "duration: x ms" alone: completes the statement this backend logged before
+            if pid in last_by_pid:
+                last_by_pid[pid][3] = float(duration.group(1))
+            continue
+        if duration:
+            current = [logged, pid, [duration.group(2)], float(duration.group(1)), True]
+        elif statement:
+            current = [logged, pid, [statement.group(1)], None, False]
+        else:
+            current = None
+            continue
+        events.append(current)
+        last_by_pid[pid] = current
+
+    result = []
+    for logged, pid, sql_lines, duration_ms, logged_at_end in events:
+        start = logged.timestamp() - (duration_ms / 1000.0 if logged_at_end and duration_ms else 0.0)
+        result.append((start, pid, "\n".join(sql_lines).strip(), duration_ms))
+    return sorted(result, key=lambda e: e[0])
+
+
+def capture_log(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        events = parse_log(f)
+    if not events:
+        return {"source": "log", "path": path}, []
+    origin = events[0][0]
+    return (
+        {"source": "log", "path": path, "duration_s": round(events[-1][0] - origin, 3),
+         "sessions": len({pid for _, pid, _, _ in events})},
+        [{"t": round(start - origin, 6), "session": pid, "name": statement_name(sql), "sql": sql,
+          "duration_ms": duration_ms} for start, pid, sql, duration_ms in events],
+    )
+
+
+# --- CAPTURE: PG_STAT_STATEMENTS ---
+
+STATS_SQL = """
+    SELECT queryid, query, calls, total_exec_time
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+"""
+
+
+def _catalogue_pattern(query):
+    """Regex matching the literal form of a normalized statement ($n -> any value, whitespace-insensitive)."""
+    pattern = ""
+    for token in re.split(r"(\$\d+)", query.strip().rstrip(";")):
+        if re.fullmatch(r"\$\d+", token):
+            pattern += r"(.+?)"
+        else:
+            pattern += r"\s+".join(re.escape(word) for word in re.split(r"\s+", token))
+    return re.compile(r"^\s*" + pattern + r"\s*;?\s*$", re.DOTALL | re.IGNORECASE)
+
+
+# Statements capture-stats may scatter over random sessions and times
+_REPLAYABLE = re.compile(r"^\s*(select|with|insert|update|delete)\b", re.IGNORECASE)
+# ... except the monitoring probes (this tool, index_advisor.py) and session-level advisory locks
+_NOT_REPLAYABLE = re.compile(r"\bpg_stat_(activity|statements)\b|\bpg_(try_)?advisory_(xact_)?(lock|unlock)", re.IGNORECASE)
+
+
+def replay_skip_reason(query):
+    """Why a pg_stat_statements entry is left out of a capture-stats workload, or None."""
+    if not _REPLAYABLE.match(query):
+        return "not DML"
+    if _NOT_REPLAYABLE.search(query):
+        return "monitoring / lock"
+    return None
+
+
+def resolve_literals(query, catalogue_sql):
+    """The literal text of a normalized statement, from the first catalogued query it matches."""
+    if not re.search(r"\$\d", query):
+        return query
+    pattern = _catalogue_pattern(query)
+    for sql in catalogue_sql:
+        if pattern.match(sql):
+            return sql.strip().rstrip(";")
+    return None
+
+
+def capture_stats(conn, seconds, seed=42, catalogue_sql=()):
+    """Diffs two pg_stat_statements snapshots `seconds` apart into synthetic, replayable events."""
+    def snapshot():
+        with conn.cursor() as cur:
+            cur.execute(STATS_SQL)
+            rows = {row[0]: row[1:] for row in cur.fetchall()}
+        conn.rollback()
+        return rows
+
+    before = snapshot()
+    print(f"pg_stat_statements snapshot taken; waiting {seconds:.0f}s for the second one...")
+    sessions = 1
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM pg_stat_activity WHERE backend_type = 'client backend' "
+                        "AND datname = current_database() AND pid <> pg_backend_pid()")
+            sessions = max(sessions, cur.fetchone()[0])
+        conn.rollback()
+        time.sleep(min(5.0, max(0.0, deadline - time.time())))
+    after = snapshot()
+
+    rng = random.Random(seed)
+    events, skipped = [], {}
+    for queryid, (query, calls, total_ms) in after.items():
+        old_calls, old_total = before.get(queryid, (query, 0, 0.0))[1:]
+        delta = calls - old_calls
+        if delta <= 0:
+            continue
+        reason = replay_skip_reason(query)
+        sql = None if reason else resolve_literals(query, catalogue_sql)
+        if sql is None:
+            skipped[str(queryid)] = {"calls": delta, "reason": reason or "no literal text",
+                                     "query": " ".join(query.split())[:200]}
+            continue
+        mean_ms = (total_ms - old_total) / delta
+        for _ in range(delta):
+            events.append({"t": round(rng.uniform(0, seconds), 6), "session": rng.randrange(sessions),
+                           "name": str(queryid), "sql": sql, "duration_ms": round(mean_ms, 4)})
+    events.sort(key=lambda e: e["t"])
+    header = {"source": "pg_stat_statements", "duration_s": seconds, "sessions": sessions,
+              "skipped_calls": sum(s["calls"] for s in skipped.values()), "skipped": skipped}
+    return header, events
+
+
+# --- FILE ---
+
+def save_workload(path, header, events):
+    header = dict(header, format="workload", version=WORKLOAD_FORMAT_VERSION, events=len(events),
+                  captured_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n")
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def load_workload(path):
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != "workload" or header.get("version") != WORKLOAD_FORMAT_VERSION:
+            raise ValueError(f"{path}: not a version {WORKLOAD_FORMAT_VERSION} workload file")
+        events = [json.loads(line) for line in f if line.strip()]
+    return header, events
+
+
+# --- REPLAY ---
+
+class ReplayStats:
+    """Per-statement response / service histograms, errors and the worst schedule lag."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.response = {}
+        self.service = {}
+        self.errors = {}
+        self.interval = LatencyHistogram()
+        self.lag = 0.0
+
+    def record(self, name, response, service, lag):
+        with self._lock:
+            if name not in self.response:
+                self.response[name], self.service[name] = LatencyHistogram(), LatencyHistogram()
+            self.lag = max(self.lag, lag)
+        self.response[name].record(response)
+        self.service[name].record(service)
+        self.interval.record(response)
+
+    def error(self, name, exc):
+        key = (name, str(exc).strip().splitlines()[0] if str(exc).strip() else type(exc).__name__)
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def take_interval(self):
+        with self._lock:
+            lag, self.lag = self.lag, 0.0
+        return self.interval.take(), lag
+
+
+def _lanes(events, max_connections):
+    """Sessions mapped onto at most `max_connections` lanes, each a time-ordered event list."""
+    sessions = sorted({str(e["session"]) for e in events})
+    count = max(1, min(len(sessions), max_connections)) if sessions else 0
+    lane_of = {session: i % count for i, session in enumerate(sessions)}
+    lanes = [[] for _ in range(count)]
+    for event in events:
+        lanes[lane_of[str(event["session"])]].append(event)
+    return lanes
+
+
+def replay_lane(connect, events, speed, start, stats, stop):
+    conn = connect()
+    conn.autocommit = True
+    try:
+        for event in events:
+            if stop.is_set():
+                break
+            intended = start + event["t"] / speed if speed else None
+            if intended is not None:
+                delay = intended - time.perf_counter()
+                if delay > 0 and stop.wait(delay):
+                    break
+            started = time.perf_counter()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(event["sql"])
+                    if cur.description is not None:
+                        cur.fetchall()
+            except Exception as e:
+                stats.error(event["name"], e)
+                if conn.closed:
+                    conn = connect()
+                    conn.autocommit = True
+                continue
+            done = time.perf_counter()
+            response = done - (intended if intended is not None else started)
+            stats.record(event["name"], response, done - started, max(0.0, started - (intended or started)))
+    finally:
+        conn.close()
+
+
+def replay(connect, header, events, speed=1.0, max_connections=64, read_only=False, report_every=10.0):
+    """Replays `events` on one connection per lane; returns the ReplayStats."""
+    if read_only:
+        events = [e for e in events if not is_write(e["sql"])]
+    lanes = _lanes(events, max_connections)
+    expected = (events[-1]["t"] / speed) if events and speed else None
+    print(f"Replaying {len(events)} statements of {header.get('source')} capture on {len(lanes)} connections "
+          f"at {'max speed' if not speed else f'{speed:g}x'}"
+          + (f" (~{expected:.0f}s)" if expected is not None else ""))
+
+    stats = ReplayStats()
+    stop = threading.Event()
+    start = time.perf_counter() + 0.5  # all lanes connected before the first event is due
+    threads = [threading.Thread(target=replay_lane, args=(connect, lane, speed, start, stats, stop),
+                                name=f"replay-{i}", daemon=True) for i, lane in enumerate(lanes)]
+    for thread in threads:
+        thread.start()
+
+    last = time.perf_counter()
+    try:
+        while any(t.is_alive() for t in threads):
+            for thread in threads:
+                thread.join(timeout=max(0.0, last + report_every - time.perf_counter()))
+            now = time.perf_counter()
+            hist, lag = stats.take_interval()
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {hist.count / (now - last):8.1f} stmt/s  "
+                  f"p50 {_ms(hist.percentile(50))}  p99 {_ms(hist.percentile(99))}  p999 {_ms(hist.percentile(99.9))} ms  "
+                  f"behind schedule {lag:5.2f}s  errors {sum(stats.errors.values())}")
+            last = now
+    except KeyboardInterrupt:
+        print("\nStopped by user")
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
+    return stats
+
+
+def _ms(value):
+    return f"{value:7.2f}" if value is not None else "      -"
+
+
+def report(stats, events, top=25):
+    """Per-statement table (busiest first) with the captured duration next to the replayed latencies."""
+    captured = {}
+    sample = {}
+    for event in events:
+        if event.get("duration_ms") is not None:
+            captured.setdefault(event["name"], []).append(event["duration_ms"])
+        sample.setdefault(event["name"], event["sql"])
+
+    print(f"\n--- Replay Latency By Statement (top {top} by total time) ---")
+    print("(captured: mean duration in the capture; service: execution only; p50/p99/p999: from the scheduled start)")
+    print(f"{'statement':<12} {'calls':>7} {'errors':>6} {'captured':>9} {'service':>8} {'p50 ms':>8} {'p99 ms':>8} {'p999 ms':>8}  sql")
+    errors = {}
+    for (name, _), n in stats.errors.items():
+        errors[name] = errors.get(name, 0) + n
+    names = sorted(stats.response, key=lambda n: -stats.service[n].total_us)
+    for name in names[:top]:
+        hist = stats.response[name]
+        before = captured.get(name)
+        before_ms = f"{sum(before) / len(before):9.2f}" if before else "        -"
+        print(f"{name:<12} {hist.count:>7} {errors.get(name, 0):>6} {before_ms} {_ms(stats.service[name].percentile(50)):>8} "
+              f"{_ms(hist.percentile(50)):>8} "
+              f"{_ms(hist.percentile(99)):>8} {_ms(hist.percentile(99.9)):>8}  {' '.join(sample[name].split())[:60]}")
+    total = LatencyHistogram()
+    for hist in stats.response.values():
+        total.merge(hist)
+    summary = total.summary()
+    print(f"All: {summary['count']} statements, p50 {_ms(summary['p50_ms'])}  p99 {_ms(summary['p99_ms'])}  "
+          f"p999 {_ms(summary['p999_ms'])} ms, {sum(stats.errors.values())} errors")
+    for (name, message), n in sorted(stats.errors.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {n} x {name}: {message}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture real database traffic and replay it at a chosen speed.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    log_parser = subparsers.add_parser("capture-log", help="Build a workload from a server statement log")
+    log_parser.add_argument("logfile")
+    log_parser.add_argument("--out", required=True)
+
+    stats_parser = subparsers.add_parser("capture-stats", help="Build a workload from pg_stat_statements deltas")
+    stats_parser.add_argument("--seconds", type=float, default=300, help="Observation window")
+    stats_parser.add_argument("--seed", type=int, default=42)
+    stats_parser.add_argument("--out", required=True)
+
+    replay_parser = subparsers.add_parser("replay", help="Replay a workload file")
+    replay_parser.add_argument("workload")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Time scale: 1 = as captured, 10 = ten times faster, 0 = no waits")
+    replay_parser.add_argument("--database", help="Target database (default: the one in DB_URL)")
+    replay_parser.add_argument("--max-connections", type=int, default=64, help="Sessions beyond this share connections")
+    replay_parser.add_argument("--read-only", action="store_true", help="Skip statements that modify data or schema")
+    replay_parser.add_argument("--report-interval", type=float, default=10)
+    replay_parser.add_argument("--out", help="Write the overall and per-statement summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.command == "capture-log":
+        header, events = capture_log(args.logfile)
+        save_workload(args.out, header, events)
+        print(f"Saved {len(events)} statements from {header.get('sessions', 0)} sessions to {args.out}")
+        return 0
+
+    from db_bulk_init import connect, database_url
+
+    if args.command == "capture-stats":
+        from plan_capture import catalogue
+        catalogue_sql = [sql for sql, _ in catalogue().values()]
+        conn = connect(database_url())
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+                if cur.fetchone() is None:
+                    print("pg_stat_statements is not installed (see 06_hero_keys_indexes.sql); use capture-log", file=sys.stderr)
+                    return 1
+            header, events = capture_stats(conn, args.seconds, args.seed, catalogue_sql)
+        finally:
+            conn.close()
+        save_workload(args.out, header, events)
+        reasons = {}
+        for entry in header["skipped"].values():
+            reasons[entry["reason"]] = reasons.get(entry["reason"], 0) + entry["calls"]
+        print(f"Saved {len(events)} calls over {header['sessions']} sessions to {args.out} "
+              f"({header['skipped_calls']} calls of {len(header['skipped'])} statements skipped: "
+              f"{', '.join(f'{n} {reason}' for reason, n in reasons.items()) or 'none'})")
+        return 0
+
+    if args.speed < 0:
+        parser.error("--speed must be >= 0")
+    header, events = load_workload(args.workload)
+    url = database_url(args.database)
+    stats = replay(lambda: connect(url), header, events, args.speed, args.max_connections,
+                   args.read_only, args.report_interval)
+    summary = report(stats, events)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"workload": args.workload, "speed": args.speed, "all": summary,
+                       "statements": {name: hist.summary() for name, hist in stats.response.items()}}, f, indent=1)
+        print(f"Saved: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())